@@ -1,9 +1,14 @@
+import threading
 import time
 
 from api.modeAPI import upload_router
+from config.index import config
 from core.logging import logger
-from fastapi import FastAPI, HTTPException, Request
+from core.metrics import metrics
+from core.readiness import ModelNotReadyError, readiness
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from models.schemas import (
     DeleteRequest,
     DeleteResponseModel,
@@ -13,12 +18,20 @@ from models.schemas import (
 )
 from services.document_service import delete_collection
 from services.embedder import embed_text
-from services.HybridRAGEngineFactory import hybrid_RAG_engine_factory
+from services.HybridRAGEngineFactory import (
+    BM25_PREWARM_COLLECTIONS,
+    hybrid_RAG_engine_factory,
+)
 from services.rag_service import search_rag
 from services.record_service import delete_document, update_document
 
 app = FastAPI(docs_url="/docs")
 
+# How long a request waits for a model that is still loading before answering 503
+MODEL_READY_WAIT_SECONDS: float = float(
+    getattr(config.RAG.Retrieval, "modelReadyWaitSeconds", 5)
+)
+
 ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -49,7 +62,45 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 
-app.include_router(upload_router)
+def require_models(*names: str):
+    """Dependency: wait up to MODEL_READY_WAIT_SECONDS for the models, else 503."""
+
+    def dependency():
+        try:
+            readiness.wait(names, timeout=MODEL_READY_WAIT_SECONDS)
+        except ModelNotReadyError as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "5"}
+            )
+
+    return Depends(dependency)
+
+
+# Without usingRerank the reranker is not loaded at startup (it loads on first use), so
+# searches must not wait for it or answer 503 on its account
+SEARCH_MODELS = (
+    ("embedding", "reranker") if config.RAG.Retrieval.usingRerank else ("embedding",)
+)
+
+app.include_router(upload_router, dependencies=[require_models("embedding")])
+
+
+@app.on_event("startup")
+def load_models():
+    # Models load in background threads: /health answers right away, /ready once loaded
+    readiness.start()
+
+
+@app.on_event("startup")
+def prewarm_bm25_indexes():
+    if BM25_PREWARM_COLLECTIONS:
+        # Off the startup path: the service answers /health while indexes load
+        threading.Thread(
+            target=hybrid_RAG_engine_factory.prewarm,
+            args=(BM25_PREWARM_COLLECTIONS,),
+            name="bm25-prewarm",
+            daemon=True,
+        ).start()
 
 
 @app.get("/healthz")
@@ -58,7 +109,21 @@ def health_check():
     return {"status": "ok"}
 
 
-@app.post("/search")
+@app.get("/ready")
+def ready_check():
+    ready = readiness.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": readiness.status()},
+    )
+
+
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
+@app.post("/search", dependencies=[require_models(*SEARCH_MODELS)])
 def search(req: SearchRequest):
     try:
         return search_rag(req)
@@ -66,15 +131,15 @@ def search(req: SearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/search/hybrid")
+@app.post("/search/hybrid", dependencies=[require_models(*SEARCH_MODELS)])
 def hybrid_search(req: HybridSearchRequest):
     try:
-        return hybrid_RAG_engine_factory.get(req.collection_name).hybrid_search_rag(req)
+        return hybrid_RAG_engine_factory.search(req)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.put("/update")
+@app.put("/update", dependencies=[require_models("embedding")])
 def update(req: UpdateRequest):
     try:
         return update_document(req)
@@ -98,7 +163,7 @@ def delete_doc(req: DeleteRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/check_embedding_model")
+@app.post("/check_embedding_model", dependencies=[require_models("embedding")])
 def check_embedding_model():
     try:
         embed_text("基本給はどのように決まりますか？")
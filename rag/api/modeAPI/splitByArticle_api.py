@@ -5,15 +5,15 @@ import uuid
 from dataclasses import asdict, dataclass
 from typing import Iterator, Optional
 
-import fitz
 import jaconv
-import numpy as np
 from config.index import config
 from core.logging import logger
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from langchain_core.documents import Document
 from models.schemas import ArticleBasedSplitRecordMetadataModel, UploadFileResultModel
 from repositories.chroma_repository import chroma_db
 from services.embedder import embed_text_batch
+from services.HybridRAGEngineFactory import hybrid_RAG_engine_factory
 
 router = APIRouter()
 
@@ -178,6 +178,8 @@ class PDFExtractor:
 
     def extract_lines(self) -> Iterator[tuple[int, float, str]]:
         """PDFから行単位でテキストを抽出"""
+        import fitz  # PyMuPDF、初回使用時に読み込み
+
         try:
             doc = fitz.open(stream=self.pdf_bytes, filetype="pdf")  # type: ignore
         except Exception as e:
@@ -617,17 +619,30 @@ async def upload_file_split_by_article(
 
         # テキストの埋め込みベクトルを生成
         logger.info(f"Generating embeddings for {len(text_contents)} articles...")
+        # 元の順序の float32 ndarray (len(text_contents), dim) として返る
         embeddings = embed_text_batch(text_contents)
-        # transform into ndarray[Any, dtype[int32 | float32]]
-        embeddings = np.array(embeddings, dtype=np.float32)
 
         # Chromaデータベースに保存
+        ids = [str(uuid.uuid4()) for _ in range(len(documents))]
         chroma_db.get_or_create_collection(name=collection_name).add(
-            ids=[str(uuid.uuid4()) for _ in range(len(documents))],
+            ids=ids,
             documents=documents,
             embeddings=embeddings,
             metadatas=metadatas,
         )
+        # rerank用に条項のトークンIDを保存（rerankPretokenize有効時のみ）
+        from services.reranker_service import pretokenize_passages
+
+        pretokenize_passages(ids, documents)
+
+        # キャッシュ済みのBM25インデックスに新しい条項を追加
+        hybrid_RAG_engine_factory.on_documents_added(
+            collection_name,
+            [
+                Document(id=doc_id, page_content=doc, metadata=meta)
+                for doc_id, doc, meta in zip(ids, documents, metadatas)
+            ],
+        )
 
         return UploadFileResultModel(
             status="uploaded",
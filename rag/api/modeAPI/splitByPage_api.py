@@ -10,6 +10,7 @@ from fastapi import APIRouter, Form, HTTPException
 from pydantic import BaseModel
 from repositories.chroma_repository import chroma_db
 from services.embedder import embed_text
+from services.page_store import page_store
 from utils.solr import get_solr_doc_by_id
 from utils.text_splitter import split_text
 
@@ -56,7 +57,7 @@ async def upload_pdf_pages_stored_in_solr(
             documents = [
                 chunk for chunk in chunks if chunk is not None and chunk.strip()
             ]
-            embeddings = [embed_text(chunk) for chunk in chunks]
+            embeddings = [embed_text(chunk) for chunk in documents]
             relative_path = page.file_path_s if page.file_path_s else ""
             relative_path = relative_path[relative_path.find("uploads") :]
             metadatas: list[Metadata] = [
@@ -69,15 +70,33 @@ async def upload_pdf_pages_stored_in_solr(
                 }
                 for _ in documents
             ]
-            ids = [str(uuid.uuid4()) for _ in documents]
-            metadata = {"name": collection_name}
-            collection = chroma_db.get_or_create_collection(
-                name=cur_page_id, metadata=metadata
-            )
             embeddings = np.array(embeddings, dtype=np.float32)
-            collection.add(
-                documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
-            )
+            if page_store.enabled:
+                # 全ページのチャンクを共有コレクションに格納（ページ単位のコレクションを作らない）
+                page_store.add_page_chunks(
+                    page_id=cur_page_id,
+                    collection_name=collection_name,
+                    documents=documents,
+                    embeddings=embeddings,
+                    metadatas=metadatas,
+                )
+                ids = page_store.chunk_ids(cur_page_id, len(documents))
+            else:
+                ids = [str(uuid.uuid4()) for _ in documents]
+                metadata = {"name": collection_name}
+                collection = chroma_db.get_or_create_collection(
+                    name=cur_page_id, metadata=metadata
+                )
+                collection.add(
+                    documents=documents,
+                    metadatas=metadatas,
+                    ids=ids,
+                    embeddings=embeddings,
+                )
+            # rerank用にpassageのトークンIDを保存（rerankPretokenize有効時のみ）
+            from services.reranker_service import pretokenize_passages
+
+            pretokenize_passages(ids, documents)
             chunk_count += len(chunks)
 
         except Exception as e:
@@ -38,6 +38,10 @@ async def upload_file(collection_name: str = Form(...), file: UploadFile = File(
         collection.add(
             documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
         )
+        # rerankモジュールは取り込み時にのみ読み込む
+        from services.reranker_service import pretokenize_passages
+
+        pretokenize_passages(ids, documents)
 
         return {"status": "uploaded", "count": len(documents)}
 
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Thread-safe LRU cache with an optional time-to-live per entry.
+    Expired entries are dropped when they are looked up or reach the LRU end.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._entries: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if self.ttl is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+__all__ = ["LRUCache"]
@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+
+class Counter:
+    """Monotonic thread-safe counter."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Summary:
+    """
+    Thread-safe summary of observed values (latencies, sizes...).
+    Percentiles are computed over the last `window` observations only.
+    """
+
+    def __init__(self, window: int = 1024):
+        self._window = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._window.append(value)
+            self._count += 1
+            self._total += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            values = sorted(self._window)
+            count, total, max_value = self._count, self._total, self._max
+        if not values:
+            return {"count": 0}
+
+        def _pct(p: float) -> float:
+            return values[min(len(values) - 1, int(p * len(values)))]
+
+        return {
+            "count": count,
+            "mean": total / count,
+            "max": max_value,
+            "p50": _pct(0.50),
+            "p95": _pct(0.95),
+            "p99": _pct(0.99),
+        }
+
+
+class MetricsRegistry:
+    """In-process metrics, exposed as JSON by the /metrics endpoint."""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._summaries: Dict[str, Summary] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def summary(self, name: str) -> Summary:
+        with self._lock:
+            return self._summaries.setdefault(name, Summary())
+
+    def gauge(self, name: str, fn: Callable[[], object]) -> None:
+        """Register a callback evaluated on every snapshot."""
+        with self._lock:
+            self._gauges[name] = fn
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = dict(self._summaries)
+            gauges = dict(self._gauges)
+        return {
+            "counters": {k: c.value for k, c in sorted(counters.items())},
+            "summaries": {k: s.snapshot() for k, s in sorted(summaries.items())},
+            "gauges": {k: fn() for k, fn in sorted(gauges.items())},
+        }
+
+
+metrics = MetricsRegistry()
+
+__all__ = ["metrics", "Counter", "Summary", "MetricsRegistry"]
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from core.logging import logger
+
+
+class ModelNotReadyError(Exception):
+    """A model is still loading (or failed to load) and the caller cannot wait longer."""
+
+
+@dataclass
+class _Component:
+    name: str
+    loader: Callable[[], Any]
+    eager: bool
+    future: Future = field(default_factory=Future)
+    state: str = "pending"  # pending -> loading -> ready | failed
+    started_at: Optional[float] = None
+    load_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class Readiness:
+    """
+    Loads named components (models) in background threads and lets callers wait on them.
+
+    Eager components start loading on `start()` (service startup) and gate `/ready`; lazy
+    ones start on their first `wait`. Outside the API (scripts) nothing is started up front,
+    so the first `wait` simply loads the component and blocks until it is there.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, _Component] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], *, eager: bool = True) -> None:
+        with self._lock:
+            self._components[name] = _Component(name=name, loader=loader, eager=eager)
+
+    def start(self) -> None:
+        """Start loading every eager component, each in its own thread."""
+        for component in list(self._components.values()):
+            if component.eager:
+                self._start(component)
+
+    def _start(self, component: _Component) -> None:
+        with self._lock:
+            if component.state != "pending":
+                return
+            component.state = "loading"
+            component.started_at = time.perf_counter()
+        threading.Thread(
+            target=self._load, args=(component,), name=f"load-{component.name}", daemon=True
+        ).start()
+
+    def _load(self, component: _Component) -> None:
+        logger.info(f"[RAG] Loading {component.name} model in the background")
+        try:
+            value = component.loader()
+        except BaseException as e:
+            component.load_seconds = time.perf_counter() - component.started_at
+            component.error = str(e)
+            component.state = "failed"
+            logger.error(f"[RAG] Failed to load {component.name} model: {e}")
+            component.future.set_exception(e)
+            return
+        component.load_seconds = time.perf_counter() - component.started_at
+        component.state = "ready"
+        logger.info(
+            f"[RAG] {component.name} model ready in {component.load_seconds:.1f}s"
+        )
+        component.future.set_result(value)
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        The loaded component, starting its load if needed. Raises ModelNotReadyError when
+        it is not loaded within `timeout` seconds (None: wait) or failed to load.
+        """
+        component = self._components[name]
+        self._start(component)
+        try:
+            return component.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise ModelNotReadyError(f"{name} model is still loading") from None
+        except Exception as e:
+            raise ModelNotReadyError(f"{name} model failed to load: {e}") from e
+
+    def wait(self, names: Iterable[str], timeout: Optional[float] = None) -> None:
+        """Wait for several components, `timeout` seconds in total."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in names:
+            if name not in self._components:
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self.get(name, remaining)
+
+    def is_ready(self) -> bool:
+        return all(c.state == "ready" for c in self._components.values() if c.eager)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        now = time.perf_counter()
+        return {
+            c.name: {
+                "state": c.state,
+                "eager": c.eager,
+                "load_seconds": (
+                    round(c.load_seconds, 3)
+                    if c.load_seconds is not None
+                    else round(now - c.started_at, 3) if c.started_at is not None else None
+                ),
+                "error": c.error,
+            }
+            for c in self._components.values()
+        }
+
+
+readiness = Readiness()
+
+__all__ = ["readiness", "Readiness", "ModelNotReadyError"]
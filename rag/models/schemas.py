@@ -1,7 +1,8 @@
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Union
 from typing_extensions import Self
 from core.logging import logger
-from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from services.search_filter import normalize_where
 
 
 class SearchRequest(BaseModel):
@@ -19,7 +20,13 @@ class BM25Params(BaseModel):
 class HybridSearchRequest(BaseModel):
     model_config = ConfigDict(extra="allow")
 
-    collection_name: str = Field(..., description="List of collection names to search")
+    collection_name: Union[str, List[str]] = Field(
+        ...,
+        description=(
+            "Collection name, or list of collection names searched as one corpus "
+            "(corpus-wide BM25 statistics, merged fusion and rerank)"
+        ),
+    )
     query: str = Field(..., description="The search query string")
     top_k: int = Field(default=10, description="Number of top results to return")
     vector_only: Optional[bool] = Field(
@@ -44,15 +51,58 @@ class HybridSearchRequest(BaseModel):
         default=None,
         description="Parameters for BM25 ranking algorithm",
     )
+    where: Optional[Dict[str, Union[str, List[str]]]] = Field(
+        default=None,
+        description=(
+            "Metadata filter applied before scoring: field -> value, or list of accepted "
+            "values (e.g. DocumentName, uploaded_by_s, file_id); fields are ANDed"
+        ),
+    )
+    fusion: Literal["rrf", "minmax", "zscore"] = Field(
+        default="rrf",
+        description=(
+            "Hybrid fusion method: weighted reciprocal rank fusion, or weighted sum of "
+            "min-max / z-score normalized scores"
+        ),
+    )
+    rrf_k: int = Field(
+        default=60, description="Rank constant for reciprocal rank fusion", ge=1
+    )
+    fusion_score_threshold: Optional[float] = Field(
+        default=None,
+        description=(
+            "Drop hybrid candidates whose fused score is below this value before reranking "
+            "(the scale depends on the fusion method)"
+        ),
+    )
+
+    @property
+    def collection_names(self) -> List[str]:
+        names = (
+            [self.collection_name]
+            if isinstance(self.collection_name, str)
+            else self.collection_name
+        )
+        return list(dict.fromkeys(names))
+
+    @field_validator("where")
+    @classmethod
+    def validate_where(cls, where):
+        # Unknown fields and empty value lists are client errors (422), not failed searches
+        normalize_where(where)
+        return where
 
     @model_validator(mode="after")
     def validate_search_params(self) -> Self:
+        if not self.collection_names or not all(self.collection_names):
+            raise ValueError("collection_name must name at least one collection.")
+
         if self.vector_only and self.bm25_only:
-            raise ValidationError("vector_only and bm25_only cannot both be true.")
+            raise ValueError("vector_only and bm25_only cannot both be true.")
 
         if not self.vector_only and not self.bm25_only:
             if (total_weight := (self.vector_weight + self.bm25_weight)) != 1.0:
-                raise ValidationError(
+                raise ValueError(
                     f"The sum of vector_weight and bm25_weight must be 1.0, got {total_weight}."
                 )
 
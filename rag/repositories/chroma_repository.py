@@ -1,26 +1,153 @@
-from chromadb import PersistentClient
+import functools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import chromadb.errors
+from chromadb import Collection, PersistentClient
 from config.index import config
-from typing import Optional
-from langchain_chroma import Chroma
+
+# What Chroma raises for a collection that does not exist: NotFoundError in recent
+# releases, InvalidCollectionException before that. Only releases with neither raise a
+# plain ValueError, which otherwise means bad arguments and must not count as missing.
+COLLECTION_NOT_FOUND: Tuple[type, ...] = tuple(
+    getattr(chromadb.errors, name)
+    for name in ("NotFoundError", "InvalidCollectionException")
+    if hasattr(chromadb.errors, name)
+) or (ValueError,)
+# Age after which the name -> metadata registry is reloaded, so collections created or
+# deleted by another process show up in metadata lookups
+REGISTRY_TTL_SECONDS: float = float(
+    getattr(config.RAG.VectorStore, "registryTTLSeconds", 30)
+)
+
+
+class _CachedCollection:
+    """
+    Cached collection handle. A call failing because the collection no longer exists
+    (e.g. deleted by another process) drops the handle, so the next lookup asks Chroma.
+    """
+
+    def __init__(self, repository: "ChromaRepository", collection: Collection):
+        self._repository = repository
+        self._collection = collection
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._collection, attr)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def call(*args, **kwargs):
+            try:
+                return value(*args, **kwargs)
+            except COLLECTION_NOT_FOUND:
+                self._repository.invalidate(self._collection.name)
+                raise
+
+        return call
+
 
 class ChromaRepository:
+    """
+    Thin wrapper around the Chroma client that caches collection handles by name and keeps
+    a name -> collection metadata registry, so hot paths do not hit the Chroma sysdb for
+    every lookup. Collections created or deleted through this repository keep both caches
+    up to date. Changes made by another process are picked up when a cached handle finds
+    its collection gone, when the registry expires (REGISTRY_TTL_SECONDS) or a lookup has
+    no match, or after `invalidate()`.
+    """
+
     def __init__(self):
         self.client = PersistentClient(path=config.RAG.VectorStore.path)
+        self._handles: Dict[str, _CachedCollection] = {}
+        self._registry: Optional[Dict[str, dict]] = None
+        self._registry_loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _remember(self, collection: Collection) -> _CachedCollection:
+        handle = _CachedCollection(self, collection)
+        with self._lock:
+            self._handles[collection.name] = handle
+            if self._registry is not None:
+                self._registry[collection.name] = dict(collection.metadata or {})
+        return handle
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            self._handles.pop(name, None)
+            if self._registry is not None:
+                self._registry.pop(name, None)
 
     def create_collection(self, name: str):
-        return self.client.create_collection(name=name)
+        self._forget(name)
+        return self._remember(self.client.create_collection(name=name))
 
     def get_or_create_collection(self, name: str, metadata: Optional[dict] = None):
-        return self.client.get_or_create_collection(name=name, metadata=metadata)
+        collection = self._handles.get(name)
+        if collection is not None:
+            return collection
+        return self._remember(
+            self.client.get_or_create_collection(name=name, metadata=metadata)
+        )
 
     def get_collection(self, name: str):
-        return self.client.get_collection(name=name)
+        collection = self._handles.get(name)
+        if collection is not None:
+            return collection
+        return self._remember(self.client.get_collection(name=name))
 
     def delete_collection(self, name: str):
-        self.client.delete_collection(name=name)
+        try:
+            self.client.delete_collection(name=name)
+        finally:
+            self._forget(name)
 
     def list_collections(self):
-        return self.client.list_collections()
-    
+        collections = self.client.list_collections()
+        with self._lock:
+            self._registry = {
+                col.name: dict(getattr(col, "metadata", None) or {})
+                for col in collections
+            }
+            self._registry_loaded_at = time.monotonic()
+        return collections
+
+    def find_collections_by_metadata(self, key: str, value) -> List[str]:
+        """
+        Names of the collections whose metadata has `key` == `value`, answered from the
+        registry. The registry is reloaded when older than REGISTRY_TTL_SECONDS, and once
+        more on no match (another process may have just created them); names may still
+        list collections another process deleted since.
+        """
+        refreshed = (
+            self._registry is None
+            or time.monotonic() - self._registry_loaded_at > REGISTRY_TTL_SECONDS
+        )
+        if refreshed:
+            self.list_collections()
+        names = self._match(key, value)
+        if not names and not refreshed:
+            self.list_collections()
+            names = self._match(key, value)
+        return names
+
+    def _match(self, key: str, value) -> List[str]:
+        with self._lock:
+            return [
+                name
+                for name, meta in (self._registry or {}).items()
+                if meta.get(key) == value
+            ]
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop the cached handle of `name`, or every cached handle and the registry."""
+        if name is not None:
+            self._forget(name)
+            return
+        with self._lock:
+            self._handles.clear()
+            self._registry = None
+
 
-chroma_db = ChromaRepository()
\ No newline at end of file
+chroma_db = ChromaRepository()
@@ -0,0 +1,119 @@
+"""
+Benchmark the native BM25 index (services/bm25_index.py) against rank_bm25.BM25Okapi, the
+backend of LangChain's BM25Retriever that HybridRAGSearchEngine used before.
+
+Run from the rag/ directory:
+
+    python -m scripts.bench_bm25                       # synthetic Zipf corpus
+    python -m scripts.bench_bm25 --docs 50000 --queries 200
+    python -m scripts.bench_bm25 --collection splitByArticleWithHybridSearch
+
+With --collection, the corpus and queries come from the Chroma collection (queries are
+random article snippets) and are tokenized with ja_preprocess, like the engine does.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from rank_bm25 import BM25Okapi
+from services.bm25_index import BM25Index
+
+
+def _synthetic_corpus(n_docs: int, vocab_size: int, seed: int) -> List[List[str]]:
+    rng = random.Random(seed)
+    vocab = [f"t{i}" for i in range(vocab_size)]
+    weights = [1.0 / (i + 1) for i in range(vocab_size)]
+    return [
+        rng.choices(vocab, weights, k=rng.randint(5, 400)) for _ in range(n_docs)
+    ]
+
+
+def _collection_corpus(collection_name: str) -> List[List[str]]:
+    from repositories.chroma_repository import chroma_db
+    from services.ja_tokenizer import ja_preprocess
+
+    collection = chroma_db.get_collection(collection_name)
+    documents = collection.get(include=["documents"])["documents"] or []
+    return [ja_preprocess(doc) for doc in documents]
+
+
+def _timed(fn, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _report(label: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(
+        f"{label:<28} mean {statistics.mean(samples):9.3f} ms   p95 {p95:9.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=40)
+    parser.add_argument("--k1", type=float, default=1.8)
+    parser.add_argument("--b", type=float, default=0.75)
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = (
+        _collection_corpus(args.collection)
+        if args.collection
+        else _synthetic_corpus(args.docs, args.vocab, args.seed)
+    )
+    corpus = [tokens for tokens in corpus if tokens]
+    queries = []
+    for _ in range(args.queries):
+        doc = rng.choice(corpus)
+        start = rng.randrange(len(doc))
+        queries.append(doc[start : start + rng.randint(2, 8)])
+    print(f"corpus: {len(corpus)} documents, {args.queries} queries, top_k={args.top_k}")
+
+    started = time.perf_counter()
+    okapi = BM25Okapi(corpus, k1=args.k1, b=args.b)
+    print(f"{'build rank_bm25':<28} {(time.perf_counter() - started) * 1000:9.1f} ms")
+
+    started = time.perf_counter()
+    index = BM25Index()
+    index.add([str(i) for i in range(len(corpus))], corpus)
+    len(index)  # forces the build
+    print(f"{'build BM25Index':<28} {(time.perf_counter() - started) * 1000:9.1f} ms")
+
+    def _okapi_top_k(query):
+        scores = okapi.get_scores(query)
+        return sorted(range(len(scores)), key=lambda i: -scores[i])[: args.top_k]
+
+    okapi_samples, index_samples, overlaps = [], [], []
+    for query in queries:
+        okapi_samples.extend(_timed(lambda: _okapi_top_k(query), 1))
+        index_samples.extend(
+            _timed(lambda: index.top_k(query, args.top_k, args.k1, args.b), 1)
+        )
+        expected = {str(i) for i in _okapi_top_k(query)}
+        got = {doc_id for doc_id, _ in index.top_k(query, args.top_k, args.k1, args.b)}
+        overlaps.append(len(expected & got) / max(1, len(got)))
+
+    _report("query rank_bm25", okapi_samples)
+    _report("query BM25Index", index_samples)
+    print(
+        f"speedup (mean): {statistics.mean(okapi_samples) / statistics.mean(index_samples):.1f}x, "
+        f"top-k agreement: {statistics.mean(overlaps):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+CPU benchmark of ingestion embedding: fixed batches of 16 in input order versus length-sorted,
+token-budgeted batches, in-process and on worker processes.
+
+Run from the rag/ directory (the HuggingFace embedding model from the config must be available):
+
+    python -m scripts.bench_embed_batch --collection splitByArticleWithHybridSearch
+    python -m scripts.bench_embed_batch --texts 2000 --token-budget 8192 16384 --workers 1 2 4
+
+Texts are sampled from the collection, so the batches follow our real length distribution;
+without --collection, lengths are drawn from a long-tailed synthetic mix. The embedding cache
+is bypassed. Worker processes load their own model copy, which is included in the first
+timed run of each worker count (as it is in the service's first ingestion).
+"""
+
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU benchmark
+
+import argparse
+import random
+import time
+from typing import List
+
+import numpy as np
+from core.readiness import readiness
+from services.batch_embedder import BatchEmbedder
+from services.embedder import ENCODE_KWARGS, count_tokens, hf_model_dir
+
+_FILLER = "従業員は会社の定める手続きに従い、所属長の承認を得なければならない。"
+
+
+def _texts(collection_name: str | None, n: int, rng: random.Random) -> List[str]:
+    if collection_name:
+        from repositories.chroma_repository import chroma_db
+
+        documents = chroma_db.get_collection(collection_name).get(include=["documents"])[
+            "documents"
+        ]
+        documents = [d for d in documents or [] if d]
+        return [rng.choice(documents) for _ in range(n)]
+    # Mostly short articles, a few very long ones
+    return [_FILLER * max(1, int(rng.paretovariate(1.2))) for _ in range(n)]
+
+
+def _fixed_batches(model, texts: List[str], batch_size: int = 16) -> np.ndarray:
+    """Previous ingestion path: fixed-size batches in input order."""
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(model.embed_documents(texts[i : i + batch_size]))
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--token-budget", type=int, nargs="+", default=[8192, 16384])
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = _texts(args.collection, args.texts, rng)
+    model = readiness.get("embedding")
+    lengths = sorted(count_tokens(texts))
+    print(
+        f"{len(texts)} texts, tokens p50 {lengths[len(lengths) // 2]}, "
+        f"p95 {lengths[int(0.95 * (len(lengths) - 1))]}, max {lengths[-1]}; "
+        f"{os.cpu_count()} cores"
+    )
+
+    _fixed_batches(model, texts[:16])  # warm-up
+    started = time.perf_counter()
+    baseline = _fixed_batches(model, texts)
+    elapsed = time.perf_counter() - started
+    print(f"{'fixed batches of 16':<32} {len(texts) / elapsed:8.1f} texts/s")
+
+    model_dir = hf_model_dir()
+    for workers in args.workers:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        embedder = BatchEmbedder(
+            model.embed_documents,
+            count_tokens,
+            token_budget=args.token_budget[0],
+            max_batch_size=args.max_batch_size,
+            workers=workers,
+            worker_args=lambda: (model_dir, ENCODE_KWARGS, threads),
+        )
+        for budget in args.token_budget:
+            embedder.token_budget = budget
+            started = time.perf_counter()
+            vectors = embedder.embed(texts)
+            seconds = time.perf_counter() - started
+            drift = float(np.abs(vectors - baseline).max())
+            print(
+                f"{f'budget {budget}, {workers} worker(s)':<32} "
+                f"{len(texts) / seconds:8.1f} texts/s   x{elapsed / seconds:.2f}   "
+                f"max diff {drift:.2e}"
+            )
+        embedder.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+CPU benchmark of reranker batching: fixed-size batches in arrival order (each padded to its
+longest pair) versus token-length buckets under a token budget.
+
+Run from the rag/ directory (the reranker model from the config must be available):
+
+    python -m scripts.bench_rerank_batching --collection splitByArticleWithHybridSearch
+    python -m scripts.bench_rerank_batching --pairs 256 --token-budget 4096 8192 16384
+
+Passages are sampled from the collection, so the batches follow our real length
+distribution; without --collection, lengths are drawn from a long-tailed synthetic mix.
+"""
+
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU benchmark
+
+import argparse
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+import torch
+from services.reranker_service import (
+    DEFAULT_BSZ_CPU,
+    MAX_LENGTH,
+    _load_tokenizer,
+    _predict_pair_scores,
+)
+
+_QUERIES = ["有給休暇はいつから取得できますか", "出張旅費の精算期限", "在宅勤務の申請方法"]
+_FILLER = "従業員は会社の定める手続きに従い、所属長の承認を得なければならない。"
+
+
+def _passages(collection_name: str | None, n: int, rng: random.Random) -> List[str]:
+    if collection_name:
+        from repositories.chroma_repository import chroma_db
+
+        documents = chroma_db.get_collection(collection_name).get(include=["documents"])[
+            "documents"
+        ]
+        documents = [d for d in documents or [] if d]
+        return [rng.choice(documents) for _ in range(n)]
+    # Mostly short articles, a few very long ones
+    return [_FILLER * max(1, int(rng.paretovariate(1.2))) for _ in range(n)]
+
+
+def _run(pairs: List[Tuple[str, str]], batch_size: int, token_budget, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scores = _predict_pair_scores(pairs, MAX_LENGTH, batch_size, token_budget)
+        samples.append(time.perf_counter() - started)
+    return scores, statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--pairs", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BSZ_CPU)
+    parser.add_argument("--token-budget", type=int, nargs="+", default=[4096, 8192])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    rng = random.Random(args.seed)
+    pairs = [
+        (rng.choice(_QUERIES), passage)
+        for passage in _passages(args.collection, args.pairs, rng)
+    ]
+    tokenizer = _load_tokenizer()
+    lengths = sorted(
+        len(ids)
+        for ids in tokenizer(
+            [q for q, _ in pairs],
+            [p for _, p in pairs],
+            truncation="only_second",
+            max_length=MAX_LENGTH,
+        )["input_ids"]
+    )
+    print(
+        f"{len(pairs)} pairs, tokens p50 {lengths[len(lengths) // 2]}, "
+        f"p95 {lengths[int(0.95 * (len(lengths) - 1))]}, max {lengths[-1]}; "
+        f"torch threads {torch.get_num_threads()}"
+    )
+
+    _run(pairs[: args.batch_size], args.batch_size, None, 1)  # warm-up
+    baseline, elapsed = _run(pairs, args.batch_size, None, args.repeat)
+    print(f"{'fixed batches':<24} {len(pairs) / elapsed:8.1f} pairs/s")
+    for budget in args.token_budget:
+        scores, bucketed = _run(pairs, args.batch_size, budget, args.repeat)
+        drift = float((scores - baseline).abs().max())
+        print(
+            f"{f'buckets (budget {budget})':<24} {len(pairs) / bucketed:8.1f} pairs/s   "
+            f"x{elapsed / bucketed:.2f}   max score diff {drift:.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark of the two-stage rerank cascade: latency saved by pruning candidates with the
+stored embeddings before the cross-encoder, versus how much the final ranking changes.
+
+Run from the rag/ directory (embedding and reranker models from the config must be available):
+
+    python -m scripts.bench_rerank_cascade --collection splitByArticleWithHybridSearch
+    python -m scripts.bench_rerank_cascade --collection ... --top-k 5 --margin 0.02 0.05 0.1
+
+Queries are random snippets of the collection's documents; each query's candidates are its
+vector search top (top_k * 4, as in hybrid search). The reference is the cross-encoder
+ranking of all candidates; ranking change is reported as NDCG@top_k (reference scores as
+gains) and top_k overlap.
+"""
+
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import List, Sequence
+
+import torch
+from repositories.chroma_repository import chroma_db
+from services.embedder import embed_text
+from services.reranker_service import MAX_LENGTH, _guess_batch_size, _predict_pair_scores
+from services.rerank_cascade import cosine_scores, select_for_rerank
+
+
+def _ndcg_at_k(reference: Sequence[float], candidate: Sequence[float], k: int) -> float:
+    """NDCG@k of the candidate ranking, with the reference scores as gains."""
+    order = sorted(range(len(candidate)), key=lambda i: -candidate[i])[:k]
+    ideal = sorted(reference, reverse=True)[:k]
+    dcg = sum(reference[i] / math.log2(rank + 2) for rank, i in enumerate(order))
+    idcg = sum(g / math.log2(rank + 2) for rank, g in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 1.0
+
+
+def _top(scores: Sequence[float], k: int) -> set:
+    return set(sorted(range(len(scores)), key=lambda i: -scores[i])[:k])
+
+
+def _cross_encode(query: str, passages: List[str]) -> List[float]:
+    if not passages:
+        return []
+    return _predict_pair_scores(
+        [(query, p) for p in passages], MAX_LENGTH, _guess_batch_size(len(passages))
+    ).tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=None, help="default top_k * 4")
+    parser.add_argument("--margin", type=float, nargs="+", default=[0.02, 0.05, 0.1])
+    parser.add_argument("--max-candidates", type=int, default=0)
+    parser.add_argument("--query-length", type=int, default=30, help="characters")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    rng = random.Random(args.seed)
+    n_candidates = args.candidates or args.top_k * 4
+    collection = chroma_db.get_collection(args.collection)
+    documents = [d for d in collection.get(include=["documents"])["documents"] or [] if d]
+
+    workload = []
+    for _ in range(args.queries):
+        doc = rng.choice(documents)
+        start = rng.randrange(max(1, len(doc) - args.query_length))
+        query = doc[start : start + args.query_length]
+        query_vector = embed_text(query)
+        result = collection.query(
+            query_embeddings=[query_vector],
+            n_results=n_candidates,
+            include=["documents", "embeddings"],
+        )
+        passages = result["documents"][0] if result["documents"] else []
+        if len(passages) > args.top_k:
+            workload.append((query, query_vector, passages, list(result["embeddings"][0])))
+
+    _cross_encode(workload[0][0], workload[0][2])  # warm-up
+
+    full_s, references = 0.0, []
+    for query, _, passages, _ in workload:
+        started = time.perf_counter()
+        references.append(_cross_encode(query, passages))
+        full_s += time.perf_counter() - started
+    n_pairs = sum(len(passages) for _, _, passages, _ in workload)
+    print(
+        f"{len(workload)} queries, top_k {args.top_k}, {n_pairs / len(workload):.1f} "
+        f"candidates/query, torch threads {torch.get_num_threads()}"
+    )
+    print(f"{'full rerank':<16} {full_s / len(workload) * 1000:8.1f} ms/query")
+
+    for margin in args.margin:
+        cascade_s, kept_pairs, ndcg, overlap = 0.0, 0, [], []
+        for (query, query_vector, passages, vectors), reference in zip(
+            workload, references
+        ):
+            started = time.perf_counter()
+            kept = select_for_rerank(
+                cosine_scores(query_vector, vectors),
+                args.top_k,
+                margin=margin,
+                max_candidates=args.max_candidates,
+            )
+            kept_scores = _cross_encode(query, [passages[i] for i in kept])
+            cascade_s += time.perf_counter() - started
+            kept_pairs += len(kept)
+
+            # Pruned candidates rank last
+            scores = [-math.inf] * len(passages)
+            for i, score in zip(kept, kept_scores):
+                scores[i] = score
+            ndcg.append(_ndcg_at_k(reference, scores, args.top_k))
+            overlap.append(
+                len(_top(scores, args.top_k) & _top(reference, args.top_k)) / args.top_k
+            )
+        print(
+            f"{f'margin {margin}':<16} {cascade_s / len(workload) * 1000:8.1f} ms/query   "
+            f"saved {(1 - cascade_s / full_s) * 100:5.1f}%   "
+            f"pairs {kept_pairs / len(workload):5.1f}/query   "
+            f"NDCG@{args.top_k} {statistics.mean(ndcg):.4f}   "
+            f"top-{args.top_k} overlap {statistics.mean(overlap):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measure BM25 corpus tokenization throughput (documents per second): in-process with one
+Sudachi tokenizer versus the CorpusTokenizer process pool used for index builds.
+
+Run from the rag/ directory:
+
+    python -m scripts.bench_tokenize                          # synthetic Japanese corpus
+    python -m scripts.bench_tokenize --workers 2 4 8 --chunk-size 64
+    python -m scripts.bench_tokenize --collection splitByArticleWithHybridSearch
+
+The first pooled run of each worker count includes process start-up and dictionary loading
+and is reported separately ("cold").
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from services.ja_tokenizer import CorpusTokenizer, ja_preprocess
+
+_SENTENCES = [
+    "従業員は入社日から有給休暇を取得することができます。",
+    "出張旅費の精算は帰着後二週間以内に申請してください。",
+    "情報セキュリティ規程に基づき、社外への持ち出しは禁止されています。",
+    "在宅勤務を行う場合は、事前に所属長の承認を得るものとする。",
+    "第3条（適用範囲）この規程は、全ての正社員および契約社員に適用する。",
+    "育児休業の申出は、休業開始予定日の１か月前までに行わなければならない。",
+]
+
+
+def _synthetic_corpus(n_docs: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices(_SENTENCES, k=rng.randint(3, 20))) for _ in range(n_docs)]
+
+
+def _collection_corpus(collection_name: str) -> List[str]:
+    from repositories.chroma_repository import chroma_db
+
+    collection = chroma_db.get_collection(collection_name)
+    return [doc or "" for doc in collection.get(include=["documents"])["documents"] or []]
+
+
+def _throughput(label: str, n_docs: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f} s   {n_docs / elapsed:10.1f} docs/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--collection", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = (
+        _collection_corpus(args.collection)
+        if args.collection
+        else _synthetic_corpus(args.docs, args.seed)
+    )
+    print(f"corpus: {len(corpus)} documents, {sum(map(len, corpus))} characters")
+
+    ja_preprocess("")  # load the dictionary outside the measurement
+    started = time.perf_counter()
+    expected = [ja_preprocess(text) for text in corpus]
+    _throughput("in-process", len(corpus), started)
+
+    for workers in args.workers:
+        pool = CorpusTokenizer(ja_preprocess, workers, args.chunk_size)
+        try:
+            started = time.perf_counter()
+            got = pool.tokenize(corpus)
+            _throughput(f"pool x{workers} (cold)", len(corpus), started)
+            started = time.perf_counter()
+            pool.tokenize(corpus)
+            _throughput(f"pool x{workers} (warm)", len(corpus), started)
+            if got != expected:
+                print(f"  WARNING: pool x{workers} tokens differ from in-process tokens")
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
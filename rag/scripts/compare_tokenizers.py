@@ -0,0 +1,126 @@
+"""
+Compare BM25 tokenizers (Sudachi morphemes vs character n-grams) on an article corpus:
+tokenization throughput, index size, query latency and recall.
+
+Run from the rag/ directory:
+
+    python -m scripts.compare_tokenizers --collection splitByArticleWithHybridSearch
+    python -m scripts.compare_tokenizers --collection ... --ngram-sizes 2 --ngram-sizes 2 3
+
+Queries are random snippets of the corpus documents (a span of a few sentences' worth of
+characters); a query counts as recalled at k when its source document is in the top k.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from services.bm25_index import BM25Index
+from services.ja_tokenizer import ja_preprocess, ngram_preprocess
+
+
+def _collection_corpus(collection_name: str) -> Tuple[List[str], List[str]]:
+    from repositories.chroma_repository import chroma_db
+
+    batch = chroma_db.get_collection(collection_name).get(include=["documents"])
+    pairs = [(i, d) for i, d in zip(batch["ids"], batch["documents"] or []) if d]
+    return [i for i, _ in pairs], [d for _, d in pairs]
+
+
+def _queries(
+    ids: List[str], documents: List[str], n: int, length: int, seed: int
+) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        row = rng.randrange(len(documents))
+        doc = documents[row]
+        start = rng.randrange(max(1, len(doc) - length))
+        queries.append((ids[row], doc[start : start + length]))
+    return queries
+
+
+def _evaluate(
+    label: str,
+    tokenize: Callable[[str], List[str]],
+    ids: List[str],
+    documents: List[str],
+    queries: Sequence[Tuple[str, str]],
+    ks: Sequence[int],
+) -> Dict[str, object]:
+    started = time.perf_counter()
+    token_lists = [tokenize(doc) for doc in documents]
+    tokenize_s = time.perf_counter() - started
+
+    index = BM25Index()
+    index.add(ids, token_lists)
+    postings, _, _, terms = index.export()
+
+    latencies, hits = [], {k: 0 for k in ks}
+    for source_id, text in queries:
+        started = time.perf_counter()
+        top = index.top_k(tokenize(text), max(ks), k1=1.8, b=0.75)
+        latencies.append((time.perf_counter() - started) * 1000)
+        ranked = [doc_id for doc_id, _ in top]
+        for k in ks:
+            hits[k] += source_id in ranked[:k]
+
+    latencies.sort()
+    return {
+        "tokenizer": label,
+        "docs/s": len(documents) / tokenize_s,
+        "terms": len(terms),
+        "postings": postings.nnz,
+        "MiB": index.memory_bytes() / 1024**2,
+        "query ms (mean)": statistics.mean(latencies),
+        "query ms (p95)": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        **{f"recall@{k}": hits[k] / len(queries) for k in ks},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-length", type=int, default=30, help="characters")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument(
+        "--ngram-sizes",
+        type=int,
+        nargs="+",
+        action="append",
+        help="n-gram sizes of one n-gram variant (repeatable); default: 2 3",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ids, documents = _collection_corpus(args.collection)
+    queries = _queries(ids, documents, args.queries, args.query_length, args.seed)
+    print(f"corpus: {len(documents)} documents, {len(queries)} queries")
+
+    variants = [("sudachi-C", ja_preprocess)] + [
+        (
+            f"ngram-{','.join(map(str, sizes))}",
+            lambda text, sizes=tuple(sizes): ngram_preprocess(text, sizes),
+        )
+        for sizes in (args.ngram_sizes or [[2, 3]])
+    ]
+    rows = [
+        _evaluate(label, fn, ids, documents, queries, args.k) for label, fn in variants
+    ]
+
+    columns = list(rows[0])
+    print("  ".join(f"{c:>16}" for c in columns))
+    for row in rows:
+        print(
+            "  ".join(
+                f"{v:>16.3f}" if isinstance(v, float) else f"{v!s:>16}"
+                for v in row.values()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
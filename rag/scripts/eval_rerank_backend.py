@@ -0,0 +1,120 @@
+"""
+Check a CPU reranker backend (int8 dynamic quantization or ONNX) against the fp32 model:
+ranking agreement (NDCG@k with fp32 scores as graded relevance, top-1 agreement) and
+latency per (query, passage) pair.
+
+Run from the rag/ directory (the reranker model from the config must be available):
+
+    python -m scripts.eval_rerank_backend --collection splitByArticleWithHybridSearch
+    python -m scripts.eval_rerank_backend --collection ... --backend onnx --threads 4
+
+Queries are random snippets of the collection's documents; each query's candidates are its
+vector search top-N in the same collection.
+"""
+
+import os
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # CPU comparison
+
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import List, Sequence
+
+import torch
+from repositories.chroma_repository import chroma_db
+from services.reranker_service import (
+    DEFAULT_BSZ_CPU,
+    MAX_LENGTH,
+    _apply_cpu_backend,
+    _load_base_model,
+    _predict_pair_scores,
+)
+from utils.search import search_query
+
+
+def _ndcg_at_k(reference: Sequence[float], candidate: Sequence[float], k: int) -> float:
+    """NDCG@k of the candidate ranking, with the reference scores as gains."""
+    order = sorted(range(len(candidate)), key=lambda i: -candidate[i])[:k]
+    ideal = sorted(reference, reverse=True)[:k]
+    dcg = sum(reference[i] / math.log2(rank + 2) for rank, i in enumerate(order))
+    idcg = sum(g / math.log2(rank + 2) for rank, g in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 1.0
+
+
+def _score(model, query: str, passages: List[str]) -> tuple[List[float], float]:
+    started = time.perf_counter()
+    scores = _predict_pair_scores(
+        [(query, p) for p in passages], MAX_LENGTH, DEFAULT_BSZ_CPU, model=model
+    )
+    return scores.tolist(), time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--backend", choices=["int8", "onnx"], default="int8")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--query-length", type=int, default=30, help="characters")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    rng = random.Random(args.seed)
+    collection = chroma_db.get_collection(args.collection)
+    documents = [d for d in collection.get(include=["documents"])["documents"] or [] if d]
+
+    workload = []
+    for _ in range(args.queries):
+        doc = rng.choice(documents)
+        start = rng.randrange(max(1, len(doc) - args.query_length))
+        query = doc[start : start + args.query_length]
+        hits = search_query(collection, query, top_k=args.candidates)
+        workload.append((query, [hit.content for hit in hits]))
+
+    fp32 = _load_base_model()
+    candidate, backend = _apply_cpu_backend(_load_base_model(), args.backend)
+    if backend != args.backend:
+        raise SystemExit(f"Backend '{args.backend}' unavailable (fell back to {backend})")
+
+    _score(fp32, *workload[0])  # warm-up
+    _score(candidate, *workload[0])
+
+    ndcg = {k: [] for k in args.k}
+    top1, n_pairs, fp32_s, candidate_s = [], 0, 0.0, 0.0
+    for query, passages in workload:
+        if not passages:
+            continue
+        reference, elapsed = _score(fp32, query, passages)
+        fp32_s += elapsed
+        scores, elapsed = _score(candidate, query, passages)
+        candidate_s += elapsed
+        n_pairs += len(passages)
+        for k in args.k:
+            ndcg[k].append(_ndcg_at_k(reference, scores, k))
+        top1.append(
+            max(range(len(scores)), key=scores.__getitem__)
+            == max(range(len(reference)), key=reference.__getitem__)
+        )
+
+    print(
+        f"{len(top1)} queries, {n_pairs} pairs, torch threads {torch.get_num_threads()}"
+    )
+    print(f"fp32        {fp32_s / n_pairs * 1000:8.3f} ms/pair")
+    print(
+        f"{backend:<11} {candidate_s / n_pairs * 1000:8.3f} ms/pair   "
+        f"x{fp32_s / candidate_s:.2f}"
+    )
+    for k in args.k:
+        print(f"NDCG@{k:<3} {statistics.mean(ndcg[k]):.4f}")
+    print(f"top-1 agreement {statistics.mean(top1):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Fold the legacy per-page Chroma collections created by /upload-pdf-pages/solr into the
+consolidated page store (see services/page_store.py).
+
+Run from the rag/ directory:
+
+    python -m scripts.migrate_page_store --dry-run
+    python -m scripts.migrate_page_store --delete-source
+
+A per-page collection is recognised by its collection metadata `{"name": <collection_name>}`;
+the collection name itself is the page id. Embeddings are copied as-is, nothing is re-embedded.
+Migrating a page twice is safe: the page store replaces all chunks of a page on every write.
+"""
+
+import argparse
+from time import time
+
+import numpy as np
+from core.logging import logger
+from repositories.chroma_repository import chroma_db
+from services.page_store import PAGE_STORE_SHARD_KEY, page_store
+
+
+def _read_all(collection, batch_size: int):
+    ids, documents, metadatas, embeddings = [], [], [], []
+    offset = 0
+    while True:
+        batch = collection.get(
+            limit=batch_size,
+            offset=offset,
+            include=["documents", "metadatas", "embeddings"],
+        )
+        if not batch["ids"]:
+            break
+        ids.extend(batch["ids"])
+        documents.extend(batch["documents"] or [])
+        metadatas.extend(batch["metadatas"] or [{} for _ in batch["ids"]])
+        embeddings.extend(batch["embeddings"])  # type: ignore
+        offset += len(batch["ids"])
+    return ids, documents, metadatas, embeddings
+
+
+def _page_collections():
+    for col in chroma_db.list_collections():
+        meta = getattr(col, "metadata", None) or {}
+        if PAGE_STORE_SHARD_KEY in meta or page_store.is_shard(col.name):
+            continue
+        if meta.get("name"):
+            yield col.name, meta["name"]
+
+
+def migrate(*, delete_source: bool, dry_run: bool, batch_size: int) -> None:
+    started = time()
+    pages = 0
+    chunks = 0
+    for page_id, collection_name in _page_collections():
+        collection = chroma_db.get_collection(page_id)
+        _, documents, metadatas, embeddings = _read_all(collection, batch_size)
+
+        # Preserve the original chunk order of the page as chunk_index_i
+        order = sorted(
+            range(len(documents)),
+            key=lambda i: (metadatas[i] or {}).get("chunk_index_i", i),
+        )
+        documents = [documents[i] for i in order]
+        metadatas = [dict(metadatas[i] or {}) for i in order]
+        embeddings = np.array([embeddings[i] for i in order], dtype=np.float32)
+
+        logger.info(
+            f"[MIGRATE] {page_id} ({collection_name}): {len(documents)} chunks"
+            f"{' (dry run)' if dry_run else ''}"
+        )
+        if not dry_run:
+            page_store.add_page_chunks(
+                page_id=page_id,
+                collection_name=collection_name,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=metadatas,
+            )
+            if delete_source:
+                chroma_db.delete_collection(name=page_id)
+        pages += 1
+        chunks += len(documents)
+
+    logger.info(
+        f"[MIGRATE] Migrated {pages} page collections / {chunks} chunks into "
+        f"{page_store.shard_names()} in {time() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="delete each per-page collection after it has been copied",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only list what would be migrated"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    migrate(
+        delete_source=args.delete_source,
+        dry_run=args.dry_run,
+        batch_size=args.batch_size,
+    )
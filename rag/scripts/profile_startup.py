@@ -0,0 +1,122 @@
+"""
+Cold start profile of the RAG service: import time per module and model load time.
+
+Run from the rag/ directory, in a fresh interpreter (already imported modules cost nothing):
+
+    python -m scripts.profile_startup
+    python -m scripts.profile_startup --skip-models --top 30
+    python -m scripts.profile_startup --json > startup.json   # compare across releases
+
+Modules are imported in the order below, so each one's time excludes what earlier entries
+already imported. `--top` additionally runs `python -X importtime -c "import api.main"` in a
+subprocess and lists the slowest modules by cumulative import time.
+"""
+
+import argparse
+import importlib
+import json
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Heavy third-party packages first, then our modules, then the app
+MODULES = [
+    "numpy",
+    "torch",
+    "transformers",
+    "chromadb",
+    "langchain_core",
+    "langchain_chroma",
+    "langchain_huggingface",
+    "sudachipy",
+    "fitz",
+    "services.embedder",
+    "services.reranker_service",
+    "services.HybridRAGEngineFactory",
+    "services.rag_service",
+    "api.modeAPI",
+    "api.main",
+]
+
+
+def _time_imports(modules: List[str]) -> Dict[str, float]:
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def _time_models() -> Dict[str, float]:
+    from core.readiness import readiness
+
+    timings = {}
+    for name in readiness.status():
+        started = time.perf_counter()
+        readiness.get(name)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def _importtime_top(module: str, n: int) -> List[Tuple[str, float]]:
+    """Slowest modules by cumulative import time, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(rows, key=lambda row: -row[1])[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skip-models", action="store_true")
+    parser.add_argument("--top", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    imports = _time_imports(MODULES)
+    models = {} if args.skip_models else _time_models()
+    report = {
+        "python": sys.version.split()[0],
+        "imports": {name: round(s, 4) for name, s in imports.items()},
+        "models": {name: round(s, 4) for name, s in models.items()},
+        "total_seconds": round(time.perf_counter() - started, 4),
+    }
+    if args.top:
+        report["importtime_top"] = {
+            name: round(s, 4) for name, s in _importtime_top("api.main", args.top)
+        }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print("import")
+    for name, seconds in imports.items():
+        print(f"  {name:<36} {seconds * 1000:9.1f} ms")
+    if models:
+        print("model load")
+        for name, seconds in models.items():
+            print(f"  {name:<36} {seconds * 1000:9.1f} ms")
+    if args.top:
+        print("slowest imports of api.main (cumulative, -X importtime)")
+        for name, seconds in report["importtime_top"].items():
+            print(f"  {name:<36} {seconds * 1000:9.1f} ms")
+    print(f"total {report['total_seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
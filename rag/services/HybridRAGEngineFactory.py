@@ -1,72 +1,218 @@
 from __future__ import annotations
 
 import threading
-from pathlib import Path
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import jaconv
+import numpy as np
 from config.index import config
 from core.logging import logger
-from langchain.retrievers.ensemble import EnsembleRetriever
-from langchain_chroma import Chroma
-from langchain_community.retrievers import BM25Retriever
-from models.schemas import HybridSearchRequest
+from core.metrics import metrics
+from langchain_core.documents import Document
+from models.schemas import BM25Params, HybridSearchRequest
+from repositories.chroma_repository import chroma_db
+from services.bm25_index import BM25Index, CorpusStats, merge_corpus_stats
+from services.bm25_snapshot import (
+    bump_generation,
+    load_snapshot,
+    read_generation,
+    save_snapshot,
+)
 from services.embedder import embeddings
+from services.fusion import fuse
+from services.ja_tokenizer import (
+    DEFAULT_NGRAM_SIZES,
+    CorpusTokenizer,
+    TokenizeFn,
+    default_workers,
+    ja_preprocess,  # noqa: F401  (kept importable from this module)
+    resolve_tokenizer,
+)
+from services.rerank_cascade import cosine_scores, select_for_rerank
 from services.reranker_service import get_ranked_results
-from sudachipy import dictionary, tokenizer
-
-tok = None
-mode = tokenizer.Tokenizer.SplitMode.C
-
-
-CUR_DIR = Path(__file__).parent
-JA_STOPWORDS = set()
-with open(CUR_DIR / "stopwords-ja.txt", "r", encoding="utf-8") as f:
-    for line in f:
-        JA_STOPWORDS.add(line.strip())
-
-
-def ja_preprocess(text: str):
-    text = jaconv.z2h(text, kana=False, digit=True, ascii=True)
-    text = text.replace("\n", "").replace("\r", "")
-    t = text.lower()
-
-    global tok
-    if tok is None:
-        try:
-            tok = dictionary.Dictionary().create()
-        except Exception as e:
-            logger.warning(f"Sudachi tokenizer unavailable, fallback preprocessing: {e}")
-            return [t] if t else []
-
-    results = [
-        m.surface()
-        for m in tok.tokenize(t, mode)
-        if m.part_of_speech()[0] != "補助記号" and m.surface() not in JA_STOPWORDS
+from services.search_filter import BM25_INDEX_FIELDS, normalize_where
+
+BM25_LOAD_BATCH_SIZE: int = getattr(config.RAG.Retrieval, "bm25LoadBatchSize", 1000)
+BM25_SNAPSHOT_ENABLED: bool = getattr(config.RAG.Retrieval, "bm25SnapshotEnabled", True)
+BM25_PREWARM_COLLECTIONS: List[str] = list(
+    getattr(config.RAG.Retrieval, "bm25PrewarmCollections", None) or []
+)
+# Engine cache bounds: least recently used engines are evicted past either limit
+HYBRID_ENGINE_CACHE_MAX_BYTES: int = int(
+    getattr(config.RAG.Retrieval, "hybridEngineCacheMaxBytes", 2 * 1024**3)
+)
+HYBRID_ENGINE_CACHE_MAX_ENGINES: int = int(
+    getattr(config.RAG.Retrieval, "hybridEngineCacheMaxEngines", 32)
+)
+# Multi-collection hybrid search: shared pool running per-collection retrieval
+HYBRID_SEARCH_MAX_WORKERS: int = int(
+    getattr(config.RAG.Retrieval, "hybridSearchMaxWorkers", 8)
+)
+# Two-stage reranking: candidates whose stored embedding is more than rerankCascadeMargin
+# (cosine) below the top_k-th best are dropped before the cross-encoder
+RERANK_CASCADE_ENABLED: bool = getattr(config.RAG.Retrieval, "rerankCascade", False)
+RERANK_CASCADE_MARGIN: float = float(
+    getattr(config.RAG.Retrieval, "rerankCascadeMargin", 0.05)
+)
+RERANK_CASCADE_MAX_CANDIDATES: int = int(
+    getattr(config.RAG.Retrieval, "rerankCascadeMaxCandidates", 0)
+)
+# BM25 tokens: "sudachi" (morphemes) or "ngram" (character n-grams, no dictionary).
+# The resolved id is recorded in BM25 snapshots: an index built with another tokenizer
+# must not be reused.
+BM25_TOKENIZER_NAME: str = getattr(config.RAG.Retrieval, "bm25Tokenizer", "sudachi")
+BM25_NGRAM_SIZES: Tuple[int, ...] = tuple(
+    getattr(config.RAG.Retrieval, "bm25NgramSizes", None) or DEFAULT_NGRAM_SIZES
+)
+# Corpus tokenization for index builds: worker processes and documents per task.
+# N-grams are cheap enough that shipping documents to workers does not pay off.
+BM25_TOKENIZE_CHUNK_SIZE: int = int(
+    getattr(config.RAG.Retrieval, "bm25TokenizeChunkSize", 64)
+)
+
+
+@lru_cache(maxsize=1)
+def bm25_tokenizer() -> Tuple[str, TokenizeFn]:
+    """
+    (tokenizer id, tokenize function) of BM25, resolved on first BM25 use: resolving
+    "sudachi" imports sudachipy and loads its dictionary, not wanted at API import.
+    """
+    return resolve_tokenizer(BM25_TOKENIZER_NAME, BM25_NGRAM_SIZES)
+
+
+@lru_cache(maxsize=1)
+def corpus_tokenizer() -> CorpusTokenizer:
+    tokenizer_id, tokenize = bm25_tokenizer()
+    workers = (
+        int(getattr(config.RAG.Retrieval, "bm25TokenizeWorkers", None) or default_workers())
+        if tokenizer_id.startswith("sudachi")
+        else 1
+    )
+    return CorpusTokenizer(tokenize, workers, BM25_TOKENIZE_CHUNK_SIZE)
+
+
+_hybrid_executor = ThreadPoolExecutor(
+    max_workers=HYBRID_SEARCH_MAX_WORKERS, thread_name_prefix="rag-hybrid"
+)
+_hybrid_fanout_width = metrics.summary("rag.hybrid.fanout_width")
+_cascade_kept_ratio = metrics.summary("rag.rerank.cascade_kept_ratio")
+_cascade_ms = metrics.summary("rag.rerank.cascade_ms")
+
+
+def cascade_enabled() -> bool:
+    return RERANK_CASCADE_ENABLED and bool(config.RAG.Retrieval.usingRerank)
+
+
+def cascade_prune(
+    query: str,
+    docs: List[Document],
+    top_k: int,
+    stored_vectors: Callable[[List[Document]], List[Optional[np.ndarray]]],
+    query_vector: Optional[List[float]] = None,
+) -> List[Document]:
+    """
+    First stage of the rerank cascade: keep the candidates whose stored embedding is close
+    enough to the query to reach the top_k (see `select_for_rerank`), best first. On any
+    failure all candidates are kept.
+    """
+    if len(docs) <= top_k:
+        return docs
+    started = time.perf_counter()
+    try:
+        if query_vector is None:
+            query_vector = embeddings.embed_query(query)
+        scores = cosine_scores(query_vector, stored_vectors(docs))
+    except Exception as e:
+        logger.warning(f"[RAG] Cascade first stage failed, reranking all candidates: {e}")
+        return docs
+    kept = select_for_rerank(
+        scores,
+        top_k,
+        margin=RERANK_CASCADE_MARGIN,
+        max_candidates=RERANK_CASCADE_MAX_CANDIDATES,
+    )
+    _cascade_ms.observe((time.perf_counter() - started) * 1000)
+    _cascade_kept_ratio.observe(len(kept) / len(docs))
+    logger.info(f"[RAG] Cascade kept {len(kept)}/{len(docs)} candidates for reranking")
+    return [docs[i] for i in kept]
+
+
+def to_chroma_where(where: Optional[Dict[str, List[str]]]) -> Optional[dict]:
+    """The Chroma `where` clause of a normalized filter."""
+    if not where:
+        return None
+    clauses = [
+        {field: values[0]} if len(values) == 1 else {field: {"$in": values}}
+        for field, values in where.items()
     ]
-
-    return results
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def fuse_hits(
+    req: HybridSearchRequest,
+    vector_hits: List[Tuple[str, float]],
+    bm25_hits: List[Tuple[str, float]],
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Fuse vector (id, distance) and BM25 (id, score) hits, both best first, with the
+    request's fusion method and weights, then apply its fused score threshold.
+    """
+    fused_ids, fused_scores = fuse(
+        [
+            (
+                [doc_id for doc_id, _ in vector_hits],
+                # Chroma returns distances; negate so that higher is better
+                [-distance for _, distance in vector_hits],
+            ),
+            ([doc_id for doc_id, _ in bm25_hits], [score for _, score in bm25_hits]),
+        ],
+        [req.vector_weight, req.bm25_weight],
+        method=req.fusion,
+        rrf_k=req.rrf_k,
+    )
+    if req.fusion_score_threshold is not None:
+        keep = fused_scores >= req.fusion_score_threshold
+        fused_ids = [doc_id for doc_id, kept in zip(fused_ids, keep) if kept]
+        fused_scores = fused_scores[keep]
+    return fused_ids, fused_scores
 
 
 class HybridRAGSearchEngine:
 
-    def __init__(self, *, collection_name: str, embeddings):
+    def __init__(
+        self,
+        *,
+        collection_name: str,
+        embeddings,
+        on_index_loaded: Optional[Callable[[str], None]] = None,
+    ):
         self.collection_name = collection_name
         self.embeddings = embeddings
+        # Called with the collection name after the BM25 index is (re)loaded
+        self._on_index_loaded = on_index_loaded
 
         logger.info(
             f"[RAG] Initializing Chroma vectorstore for collection '{collection_name}'"
         )
+        from langchain_chroma import Chroma
+
         self.vectorstore = Chroma(
             collection_name=collection_name,
             embedding_function=self.embeddings,
             persist_directory=config.RAG.VectorStore.path,
         )
 
-        self._all_documents_cache: Optional[List] = None
+        # BM25 index over the collection, loaded once and updated incrementally. Only ids,
+        # postings and the indexed metadata fields are kept in memory; the texts of BM25
+        # hits are fetched from Chroma by id.
+        self._bm25_index: Optional[BM25Index] = None
         self._bm25_lock = threading.Lock()
 
-    def _compute_candidate_k(self, req: HybridSearchRequest) -> int:
+    @staticmethod
+    def _compute_candidate_k(req: HybridSearchRequest) -> int:
         if config.RAG.Retrieval.usingRerank:
             logger.info("[RAG] Reranker enabled")
             return max(1, req.top_k * 4)
@@ -76,30 +222,272 @@ class HybridRAGSearchEngine:
             return max(1, req.top_k * 4)
         return max(1, req.top_k)
 
-    def _maybe_rerank(self, query: str, docs: List, top_k: int) -> List:
+    @staticmethod
+    def _maybe_rerank(
+        query: str,
+        docs: List,
+        top_k: int,
+        *,
+        stored_vectors: Optional[Callable[[List[Document]], List]] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List:
         if not docs:
             logger.warning("[RAG] No documents to rank")
             return []
         if not config.RAG.Retrieval.usingRerank:
             return docs[:top_k]
+        if stored_vectors is not None and cascade_enabled():
+            docs = cascade_prune(query, docs, top_k, stored_vectors, query_vector)
         logger.info("[RAG] Reranking retrieved documents")
         ranked = get_ranked_results(query, docs, top_n=top_k)
         logger.info("[RAG] Ranking completed")
         return ranked
 
-    def _ensure_all_documents(self, refresh: bool = False) -> List:
+    def _iter_collection_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[List[str], List[str], List[dict]]]:
+        """Page through the whole collection with get(limit, offset): no embedding, no cap."""
+        offset = 0
+        while True:
+            batch = self.vectorstore.get(
+                limit=batch_size, offset=offset, include=["documents", "metadatas"]
+            )
+            ids = batch["ids"]
+            if not ids:
+                return
+            yield ids, batch["documents"], batch["metadatas"] or [{} for _ in ids]
+            offset += len(ids)
+
+    def memory_bytes(self) -> int:
+        """Approximate process memory of the BM25 index (postings, ids, metadata fields)."""
+        index = self._bm25_index
+        return index.memory_bytes() if index is not None else 0
+
+    def _ensure_bm25_index(self, refresh: bool = False) -> BM25Index:
+        loaded_now = self._bm25_index is None or refresh
+        index = self._load_bm25_index(refresh)
+        if loaded_now and self._on_index_loaded is not None:
+            self._on_index_loaded(self.collection_name)
+        return index
+
+    def _load_bm25_index(self, refresh: bool) -> BM25Index:
         with self._bm25_lock:
-            if self._all_documents_cache is None or refresh:
-                logger.info(
-                    "[RAG] Loading all documents from Chroma for BM25-capable modes"
+            if self._bm25_index is None and not refresh and BM25_SNAPSHOT_ENABLED:
+                loaded = load_snapshot(
+                    self.collection_name,
+                    expected_count=chroma_db.get_collection(self.collection_name).count(),
+                    tokenizer=bm25_tokenizer()[0],
+                    fields=BM25_INDEX_FIELDS,
                 )
-                self._all_documents_cache = self.vectorstore.similarity_search(
-                    "", k=100000
+                if loaded is not None:
+                    self._bm25_index = loaded
+
+            if self._bm25_index is None or refresh:
+                logger.info(
+                    f"[RAG] Loading BM25 corpus of '{self.collection_name}' from Chroma "
+                    f"(batch size {BM25_LOAD_BATCH_SIZE})"
                 )
+                # Read before streaming: a write during the load makes the snapshot stale
+                generation = read_generation(self.collection_name)
+                index = BM25Index(fields=BM25_INDEX_FIELDS)
+                for ids, documents, metadatas in self._iter_collection_batches(
+                    BM25_LOAD_BATCH_SIZE
+                ):
+                    # Each batch is tokenized and encoded, then dropped
+                    index.add(ids, corpus_tokenizer().tokenize(documents), metadatas)
+                self._bm25_index = index
                 logger.info(
-                    f"[RAG] Cached {len(self._all_documents_cache or [])} documents for BM25"
+                    f"[RAG] Indexed {len(index)} documents for BM25"
+                )
+                self._save_snapshot(generation)
+            return self._bm25_index
+
+    def _save_snapshot(self, generation: int) -> None:
+        if not BM25_SNAPSHOT_ENABLED or self._bm25_index is None:
+            return
+        try:
+            save_snapshot(
+                self.collection_name,
+                self._bm25_index,
+                generation=generation,
+                tokenizer=bm25_tokenizer()[0],
+            )
+        except Exception as e:
+            # The in-memory index stays usable; the next cold start rebuilds from Chroma
+            logger.warning(
+                f"[RAG] Failed to save BM25 snapshot of '{self.collection_name}': {e}"
+            )
+
+    def _get_documents(self, ids: List[str]) -> List[Document]:
+        """Fetch documents by id from Chroma, in the order of `ids` (missing ids are skipped)."""
+        if not ids:
+            return []
+        batch = self.vectorstore.get(ids=ids, include=["documents", "metadatas"])
+        metadatas = batch["metadatas"] or [{} for _ in batch["ids"]]
+        by_id = {
+            doc_id: Document(id=doc_id, page_content=text or "", metadata=meta or {})
+            for doc_id, text, meta in zip(batch["ids"], batch["documents"], metadatas)
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def _stored_vectors(self, docs: List[Document]) -> List[Optional[np.ndarray]]:
+        """Embeddings stored in Chroma for `docs`, in order (None where missing)."""
+        ids = [doc.id for doc in docs if doc.id is not None]
+        if not ids:
+            return [None] * len(docs)
+        batch = self.vectorstore.get(ids=ids, include=["embeddings"])
+        vectors = batch.get("embeddings")
+        by_id = dict(zip(batch["ids"], vectors if vectors is not None else []))
+        return [by_id.get(doc.id) for doc in docs]
+
+    def _vector_hits(
+        self,
+        query: str,
+        k: int,
+        where: Optional[Dict[str, List[str]]] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """(document, distance) pairs, nearest first."""
+        if query_vector is not None:
+            return self.vectorstore.similarity_search_by_vector_with_relevance_scores(
+                query_vector, k=k, filter=to_chroma_where(where)
+            )
+        return self.vectorstore.similarity_search_with_score(
+            query, k=k, filter=to_chroma_where(where)
+        )
+
+    def _bm25_hits(
+        self,
+        query: str,
+        bm25_params: BM25Params,
+        k: int,
+        where: Optional[Dict[str, List[str]]] = None,
+        corpus: Optional[CorpusStats] = None,
+    ) -> List[Tuple[str, float]]:
+        return self._ensure_bm25_index().top_k(
+            bm25_tokenizer()[1](query),
+            k,
+            k1=bm25_params.k1,
+            b=bm25_params.b,
+            where=where,
+            corpus=corpus,
+        )
+
+    def _bm25_search(
+        self,
+        query: str,
+        bm25_params: BM25Params,
+        k: int,
+        where: Optional[Dict[str, List[str]]] = None,
+    ) -> List[Document]:
+        hits = self._bm25_hits(query, bm25_params, k, where)
+        return self._get_documents([doc_id for doc_id, _ in hits])
+
+    def _fused_search(
+        self,
+        req: HybridSearchRequest,
+        bm25_params: BM25Params,
+        k: int,
+        where: Optional[Dict[str, List[str]]] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List[Document]:
+        """
+        Hybrid retrieval: top-k from the vector store and from BM25, fused on (id, score)
+        arrays. Only the surviving ids are materialized; each document carries its fused
+        score in metadata["fused_score"].
+        """
+        vector_hits = self._vector_hits(req.query, k, where, query_vector)
+        bm25_hits = self._bm25_hits(req.query, bm25_params, k, where)
+
+        documents: Dict[str, Document] = {
+            doc.id: doc for doc, _ in vector_hits if doc.id is not None
+        }
+        fused_ids, fused_scores = fuse_hits(
+            req, [(doc.id, distance) for doc, distance in vector_hits], bm25_hits
+        )
+
+        missing = [doc_id for doc_id in fused_ids if doc_id not in documents]
+        documents.update({doc.id: doc for doc in self._get_documents(missing)})
+
+        results = []
+        for doc_id, score in zip(fused_ids, fused_scores):
+            doc = documents.get(doc_id)
+            if doc is not None:
+                doc.metadata["fused_score"] = float(score)
+                results.append(doc)
+        return results
+
+    def add_documents(
+        self, documents: Iterable[Document], *, generation: Optional[int] = None
+    ) -> None:
+        """
+        Add newly ingested documents to the cached BM25 index (no-op until it is loaded).
+        With `generation`, the updated index is snapshotted under that generation.
+        """
+        with self._bm25_lock:
+            if self._bm25_index is None:
+                return
+            new_docs = [doc for doc in documents if doc.id]
+            if not new_docs:
+                return
+            ids = [doc.id for doc in new_docs]
+            self._bm25_index.add(
+                ids,
+                corpus_tokenizer().tokenize([doc.page_content for doc in new_docs]),
+                [doc.metadata for doc in new_docs],
+            )
+            logger.info(
+                f"[RAG] Added {len(new_docs)} documents to BM25 index of '{self.collection_name}'"
+            )
+            if generation is not None:
+                self._save_snapshot(generation)
+
+    def remove_documents(
+        self,
+        metadata_key: str,
+        values: Iterable[str],
+        *,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Drop documents whose `metadata_key` is one of `values` from the cached BM25 index.
+        With `generation`, the updated index is snapshotted under that generation.
+        """
+        with self._bm25_lock:
+            if self._bm25_index is None:
+                return
+            if metadata_key not in self._bm25_index.fields:
+                # Cannot resolve the affected ids without the metadata; reload on next use
+                logger.warning(
+                    f"[RAG] Delete by unindexed metadata '{metadata_key}', dropping BM25 index "
+                    f"of '{self.collection_name}'"
                 )
-        return self._all_documents_cache or []
+                self._bm25_index = None
+                return
+            removed = self._bm25_index.ids_where(metadata_key, [str(v) for v in values])
+            self._remove_ids_locked(removed, generation)
+
+    def remove_ids(
+        self, ids: Iterable[str], *, generation: Optional[int] = None
+    ) -> None:
+        """
+        Drop documents by id from the cached BM25 index.
+        With `generation`, the updated index is snapshotted under that generation.
+        """
+        with self._bm25_lock:
+            if self._bm25_index is None:
+                return
+            self._remove_ids_locked(list(ids), generation)
+
+    def _remove_ids_locked(self, ids: List[str], generation: Optional[int]) -> None:
+        if not ids:
+            return
+        self._bm25_index.remove(ids)  # type: ignore[union-attr]
+        logger.info(
+            f"[RAG] Removed {len(ids)} documents from BM25 index of '{self.collection_name}'"
+        )
+        if generation is not None:
+            self._save_snapshot(generation)
 
     def hybrid_search_rag(
         self, req: HybridSearchRequest, *, refresh_bm25_cache: bool = False
@@ -108,62 +496,71 @@ class HybridRAGSearchEngine:
         logger.info("[RAG] Starting hybrid_search_rag")
         try:
             k_candidates = self._compute_candidate_k(req)
+            where = normalize_where(req.where)
+            # The rerank cascade compares the query to stored embeddings: embed it once
+            query_vector = (
+                self.embeddings.embed_query(req.query)
+                if cascade_enabled() and not req.bm25_only
+                else None
+            )
+            rerank_kwargs = dict(
+                stored_vectors=self._stored_vectors, query_vector=query_vector
+            )
 
             # ----- Vector-only -----
             if req.vector_only:
                 logger.info("[RAG] Vector-only search")
-                retriever = self.vectorstore.as_retriever(
-                    search_kwargs={"k": k_candidates}
-                )
-                retrieved_docs = retriever.invoke(req.query)
+                if query_vector is not None:
+                    retrieved_docs = [
+                        doc
+                        for doc, _ in self._vector_hits(
+                            req.query, k_candidates, where, query_vector
+                        )
+                    ]
+                else:
+                    search_kwargs = {"k": k_candidates}
+                    if where:
+                        search_kwargs["filter"] = to_chroma_where(where)
+                    retriever = self.vectorstore.as_retriever(search_kwargs=search_kwargs)
+                    retrieved_docs = retriever.invoke(req.query)
                 logger.info("[RAG] Vector-only search completed")
-                return self._maybe_rerank(req.query, retrieved_docs, req.top_k)
+                return self._maybe_rerank(
+                    req.query, retrieved_docs, req.top_k, **rerank_kwargs
+                )
 
             # ----- BM25 & Hybrid  -----
-            all_documents = self._ensure_all_documents(refresh=refresh_bm25_cache)
-            if not all_documents:
+            bm25_index = self._ensure_bm25_index(refresh=refresh_bm25_cache)
+            if not len(bm25_index):
                 logger.warning("[RAG] No documents in store")
                 return []
 
-            bm25_params = req.bm25_params.model_dump() if req.bm25_params else {}
+            bm25_params = req.bm25_params or BM25Params()
 
             # ----- BM25-only -----
             if req.bm25_only:
                 logger.info("[RAG] BM25-only search")
-                bm25_retriever = BM25Retriever.from_documents(
-                    documents=all_documents,
-                    bm25_params=bm25_params,
-                    preprocess_func=ja_preprocess,
+                retrieved_docs = self._bm25_search(
+                    req.query, bm25_params, k_candidates, where
                 )
-                bm25_retriever.k = k_candidates
-                retrieved_docs = bm25_retriever.invoke(req.query)
                 logger.info("[RAG] BM25-only search completed")
-                return self._maybe_rerank(req.query, retrieved_docs, req.top_k)
+                return self._maybe_rerank(
+                    req.query, retrieved_docs, req.top_k, **rerank_kwargs
+                )
 
-            # ----- Hybrid（Ensemble）-----
+            # ----- Hybrid（Fusion）-----
             logger.info("[RAG] Hybrid search")
             multiplier = 2
             expanded_top_k = max(k_candidates, req.top_k * max(1, int(multiplier)))
 
-            vector_retriever = self.vectorstore.as_retriever(
-                search_kwargs={"k": expanded_top_k}
-            )
-            bm25_retriever = BM25Retriever.from_documents(
-                documents=all_documents,
-                bm25_params=bm25_params,
-                preprocess_func=ja_preprocess,
-            )
-            bm25_retriever.k = expanded_top_k
-
-            ensemble_retriever = EnsembleRetriever(
-                retrievers=[vector_retriever, bm25_retriever],
-                weights=[req.vector_weight, req.bm25_weight],
+            retrieved_docs = self._fused_search(
+                req, bm25_params, expanded_top_k, where, query_vector
             )
-            retrieved_docs = ensemble_retriever.invoke(req.query)
             logger.info(
                 f"[RAG] Hybrid produced {len(retrieved_docs)} candidates (pre-rerank/trim)"
             )
-            return self._maybe_rerank(req.query, retrieved_docs, req.top_k)
+            return self._maybe_rerank(
+                req.query, retrieved_docs, req.top_k, **rerank_kwargs
+            )
 
         except Exception as e:
             logger.error(
@@ -173,12 +570,32 @@ class HybridRAGSearchEngine:
 
 
 class HybridRAGEngineFactory:
-
-    # TODO: Periodically clear cached engine instances to save memory? Or limit cache size?
-    def __init__(self, embeddings):
+    """
+    Caches one HybridRAGSearchEngine per collection, in least recently used order.
+
+    Engines are evicted (oldest first) when more than `max_engines` are cached or when their
+    approximate memory (BM25 postings, ids and tracked metadata) exceeds `max_bytes`. The
+    engine being used is never evicted. An evicted engine reloads its BM25 index from the
+    on-disk snapshot on its next use.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        *,
+        max_bytes: int = HYBRID_ENGINE_CACHE_MAX_BYTES,
+        max_engines: int = HYBRID_ENGINE_CACHE_MAX_ENGINES,
+    ):
         self._embeddings = embeddings
-        self._cache: Dict[str, HybridRAGSearchEngine] = {}  # type: ignore
+        self._cache: "OrderedDict[str, HybridRAGSearchEngine]" = OrderedDict()
         self._lock = threading.Lock()
+        self.max_bytes = max_bytes
+        self.max_engines = max(1, max_engines)
+        # Corpus-wide BM25 statistics of recently searched collection sets
+        self._corpus_stats: "OrderedDict[tuple, CorpusStats]" = OrderedDict()
+        self._evictions = metrics.counter("rag.hybrid_engines.evictions")
+        metrics.gauge("rag.hybrid_engines.count", lambda: len(self._cache))
+        metrics.gauge("rag.hybrid_engines.bytes", self.memory_bytes)
 
     def get(self, collection_name: str) -> HybridRAGSearchEngine:
         if not collection_name:
@@ -189,6 +606,7 @@ class HybridRAGEngineFactory:
                 logger.info(
                     f"[RAG] Factory cache hit for collection '{collection_name}'"
                 )
+                self._cache.move_to_end(collection_name)
                 return engine
             logger.info(
                 f"[RAG] Factory creating engine for collection '{collection_name}'"
@@ -196,10 +614,234 @@ class HybridRAGEngineFactory:
             engine = HybridRAGSearchEngine(
                 collection_name=collection_name,
                 embeddings=self._embeddings,
+                on_index_loaded=self._enforce_budget,
             )
             self._cache[collection_name] = engine
+            self._evict_locked(keep=collection_name)
             return engine
 
+    def search(self, req: HybridSearchRequest) -> List[Document]:
+        """Hybrid search over the request's collection, or over several as one corpus."""
+        names = req.collection_names
+        if len(names) == 1:
+            return self.get(names[0]).hybrid_search_rag(req)
+        try:
+            return self._search_collections(names, req)
+        except Exception as e:
+            logger.error(
+                f"[RAG] Multi-collection hybrid search failed for '{req.query}': {e}",
+                exc_info=True,
+            )
+            raise Exception(f"Hybrid search operation failed: {str(e)}") from e
+
+    def _search_collections(
+        self, names: List[str], req: HybridSearchRequest
+    ) -> List[Document]:
+        """
+        Retrieve from every collection concurrently, then merge as if they were one corpus:
+        vector hits by distance (same embedding model), BM25 hits scored with corpus-wide
+        IDF and average length, fused and reranked into a single top-k. Returned documents
+        carry their collection in metadata["collection_name"].
+        """
+        logger.info(f"[RAG] Hybrid search over {len(names)} collections")
+        _hybrid_fanout_width.observe(len(names))
+        engines = [self.get(name) for name in names]
+        k_candidates = HybridRAGSearchEngine._compute_candidate_k(req)
+        where = normalize_where(req.where)
+        if not req.vector_only and not req.bm25_only:
+            k_candidates = max(k_candidates, req.top_k * 2)
+
+        # Hit keys are "<collection position>:<document id>": ids are only unique per collection
+        vector_hits: List[Tuple[str, float]] = []
+        documents: Dict[str, Document] = {}
+        query_vector: Optional[List[float]] = None
+        if not req.bm25_only:
+            query_vector = self._embeddings.embed_query(req.query)
+            futures = [
+                _hybrid_executor.submit(
+                    engine._vector_hits, req.query, k_candidates, where, query_vector
+                )
+                for engine in engines
+            ]
+            for i, future in enumerate(futures):
+                for doc, distance in future.result():
+                    if doc.id is None:
+                        continue
+                    documents[f"{i}:{doc.id}"] = doc
+                    vector_hits.append((f"{i}:{doc.id}", distance))
+            vector_hits.sort(key=lambda hit: hit[1])
+            vector_hits = vector_hits[:k_candidates]
+
+        bm25_hits: List[Tuple[str, float]] = []
+        if not req.vector_only:
+            indexes = [
+                future.result()
+                for future in [
+                    _hybrid_executor.submit(engine._ensure_bm25_index) for engine in engines
+                ]
+            ]
+            corpus = self._get_corpus_stats(indexes)
+            bm25_params = req.bm25_params or BM25Params()
+            futures = [
+                _hybrid_executor.submit(
+                    engine._bm25_hits, req.query, bm25_params, k_candidates, where, corpus
+                )
+                for engine in engines
+            ]
+            for i, future in enumerate(futures):
+                bm25_hits.extend((f"{i}:{doc_id}", score) for doc_id, score in future.result())
+            bm25_hits.sort(key=lambda hit: -hit[1])
+            bm25_hits = bm25_hits[:k_candidates]
+
+        if req.vector_only:
+            keys = [key for key, _ in vector_hits]
+        elif req.bm25_only:
+            keys = [key for key, _ in bm25_hits]
+        else:
+            keys, fused_scores = fuse_hits(req, vector_hits, bm25_hits)
+
+        missing: Dict[int, List[str]] = {}
+        for key in keys:
+            if key not in documents:
+                position, doc_id = key.split(":", 1)
+                missing.setdefault(int(position), []).append(doc_id)
+        for position, ids in missing.items():
+            for doc in engines[position]._get_documents(ids):
+                documents[f"{position}:{doc.id}"] = doc
+
+        results = []
+        for rank, key in enumerate(keys):
+            doc = documents.get(key)
+            if doc is None:
+                continue
+            doc.metadata["collection_name"] = names[int(key.split(":", 1)[0])]
+            if not req.vector_only and not req.bm25_only:
+                doc.metadata["fused_score"] = float(fused_scores[rank])
+            results.append(doc)
+        logger.info(
+            f"[RAG] Multi-collection search produced {len(results)} candidates (pre-rerank/trim)"
+        )
+        positions = {name: i for i, name in enumerate(names)}
+
+        def stored_vectors(docs: List[Document]) -> List[Optional[np.ndarray]]:
+            vectors: List[Optional[np.ndarray]] = [None] * len(docs)
+            rows_by_engine: Dict[int, List[int]] = {}
+            for row, doc in enumerate(docs):
+                position = positions[doc.metadata["collection_name"]]
+                rows_by_engine.setdefault(position, []).append(row)
+            for position, rows in rows_by_engine.items():
+                found = engines[position]._stored_vectors([docs[row] for row in rows])
+                for row, vector in zip(rows, found):
+                    vectors[row] = vector
+            return vectors
+
+        return HybridRAGSearchEngine._maybe_rerank(
+            req.query,
+            results,
+            req.top_k,
+            stored_vectors=stored_vectors,
+            query_vector=query_vector,
+        )
+
+    def _get_corpus_stats(self, indexes: List[BM25Index]) -> CorpusStats:
+        key = tuple(sorted((index.uid, index.version) for index in indexes))
+        with self._lock:
+            stats = self._corpus_stats.get(key)
+            if stats is not None:
+                self._corpus_stats.move_to_end(key)
+                return stats
+        stats = merge_corpus_stats(indexes)
+        with self._lock:
+            self._corpus_stats[key] = stats
+            while len(self._corpus_stats) > 8:
+                self._corpus_stats.popitem(last=False)
+        return stats
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            engines = list(self._cache.values())
+        return sum(engine.memory_bytes() for engine in engines)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            sizes = {name: engine.memory_bytes() for name, engine in self._cache.items()}
+        return {
+            "engines": len(sizes),
+            "bytes": sum(sizes.values()),
+            "max_engines": self.max_engines,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions.value,
+            "by_collection": sizes,
+        }
+
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        with self._lock:
+            self._evict_locked(keep=keep)
+
+    def _evict_locked(self, keep: Optional[str]) -> None:
+        """Drop least recently used engines until both limits hold. Caller holds the lock."""
+        sizes = {name: engine.memory_bytes() for name, engine in self._cache.items()}
+        total = sum(sizes.values())
+        for name in list(self._cache):
+            if len(self._cache) <= self.max_engines and total <= self.max_bytes:
+                return
+            if name == keep:
+                continue
+            self._cache.pop(name)
+            total -= sizes[name]
+            self._evictions.inc()
+            logger.info(
+                f"[RAG] Factory evicted engine for collection '{name}' "
+                f"({sizes[name]} bytes, {len(self._cache)} engines / {total} bytes left)"
+            )
+        if total > self.max_bytes:
+            logger.warning(
+                f"[RAG] Engine for collection '{keep}' alone uses {total} bytes "
+                f"(budget {self.max_bytes})"
+            )
+
+    def on_documents_added(
+        self, collection_name: str, documents: Iterable[Document]
+    ) -> None:
+        """Keep an already cached engine's BM25 index in sync with newly ingested documents."""
+        generation = bump_generation(collection_name)
+        with self._lock:
+            engine = self._cache.get(collection_name)
+        if engine is not None:
+            engine.add_documents(documents, generation=generation)
+            self._enforce_budget(keep=collection_name)
+
+    def on_documents_deleted(
+        self, collection_name: str, metadata_key: str, values: Iterable[str]
+    ) -> None:
+        """Keep an already cached engine's BM25 index in sync with a delete by metadata."""
+        generation = bump_generation(collection_name)
+        with self._lock:
+            engine = self._cache.get(collection_name)
+        if engine is not None:
+            engine.remove_documents(metadata_key, values, generation=generation)
+
+    def on_ids_deleted(self, collection_name: str, ids: Iterable[str]) -> None:
+        """Keep an already cached engine's BM25 index in sync with a delete by id."""
+        generation = bump_generation(collection_name)
+        with self._lock:
+            engine = self._cache.get(collection_name)
+        if engine is not None:
+            engine.remove_ids(ids, generation=generation)
+
+    def prewarm(self, collection_names: Iterable[str]) -> None:
+        """Create engines and load their BM25 indexes (from snapshot when valid) ahead of queries."""
+        for collection_name in collection_names:
+            try:
+                started = time.perf_counter()
+                self.get(collection_name)._ensure_bm25_index()
+                logger.info(
+                    f"[RAG] Prewarmed BM25 index of '{collection_name}' "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            except Exception as e:
+                logger.warning(f"[RAG] Failed to prewarm '{collection_name}': {e}")
+
     def clear(self, collection_name: str) -> None:
         with self._lock:
             if collection_name in self._cache:
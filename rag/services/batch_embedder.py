@@ -0,0 +1,147 @@
+"""
+Batch embedding for ingestion.
+
+Texts are sorted by token length and grouped into batches under a padded-token budget
+(see `length_buckets`), so short articles are not padded to the longest one of a
+fixed-size batch. Batches run in the calling process, or on a pool of worker processes
+that each load their own copy of the HuggingFace model, so CPU-only nodes use all their
+cores. Vectors come back in input order as one contiguous float32 array.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from core.logging import logger
+from services.batching import length_buckets
+
+EmbedFn = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# Model of a worker process, loaded by `_init_worker`
+_worker_model = None
+
+
+def _init_worker(model_dir: str, encode_kwargs: Dict, threads: int) -> None:
+    global _worker_model
+    import torch
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    # Workers share the cores: without a limit each would start one thread per core
+    torch.set_num_threads(threads)
+    _worker_model = HuggingFaceEmbeddings(
+        model_name=model_dir,
+        model_kwargs={"device": "cpu", "local_files_only": True},
+        encode_kwargs=encode_kwargs,
+    )
+
+
+def _embed_in_worker(texts: List[str]) -> np.ndarray:
+    vectors = _worker_model.embed_documents(texts)  # type: ignore[union-attr]
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class BatchEmbedder:
+    """
+    Embeds texts in length-sorted, token-budgeted batches with `embed` (in-process), or
+    on a lazily started pool of `workers` spawned processes when `worker_args` returns
+    the (model directory, encode kwargs, threads per worker) to load there. `worker_args`
+    returning None (not a local HuggingFace model, or not on CPU), `workers <= 1`, a
+    single batch, or a broken pool mean in-process embedding.
+    """
+
+    def __init__(
+        self,
+        embed: EmbedFn,
+        count_tokens: Callable[[List[str]], List[int]],
+        *,
+        token_budget: int,
+        max_batch_size: int,
+        workers: int = 1,
+        worker_args: Optional[Callable[[], Optional[tuple]]] = None,
+    ):
+        self._embed = embed
+        self._count_tokens = count_tokens
+        self.token_budget = max(1, token_budget)
+        self.max_batch_size = max(1, max_batch_size)
+        self.workers = workers
+        self._worker_args = worker_args
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_unavailable = False
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._pool is None and not self._pool_unavailable:
+                args = self._worker_args() if self._worker_args else None
+                if args is None:
+                    self._pool_unavailable = True
+                    return None
+                logger.info(f"[RAG] Starting {self.workers} embedding worker processes")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=args,
+                )
+            return self._pool
+
+    def batches(self, texts: Sequence[str]) -> List[List[int]]:
+        """Index batches of `texts`, shortest texts first."""
+        lengths = self._count_tokens(list(texts))
+        return list(length_buckets(lengths, self.token_budget, self.max_batch_size))
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Vectors of `texts`, in order, as a contiguous float32 (len(texts), dim)."""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        batches = self.batches(texts)
+        pool = self._get_pool() if self.workers > 1 and len(batches) > 1 else None
+        if pool is not None:
+            try:
+                return self._run_on_pool(pool, texts, batches)
+            except BrokenProcessPool as e:
+                logger.warning(
+                    f"[RAG] Embedding pool failed, embedding in-process: {e}"
+                )
+                self.shutdown()
+                self._pool_unavailable = True
+
+        from tqdm import tqdm
+
+        out: Optional[np.ndarray] = None
+        for batch in tqdm(batches, desc="Embedding texts"):
+            vectors = self._embed([texts[i] for i in batch])
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[batch] = vectors
+        return out  # type: ignore[return-value]
+
+    def _run_on_pool(
+        self, pool: ProcessPoolExecutor, texts: List[str], batches: List[List[int]]
+    ) -> np.ndarray:
+        from tqdm import tqdm
+
+        # Longest batches first, so the pool does not end on one long straggler
+        futures = {
+            pool.submit(_embed_in_worker, [texts[i] for i in batch]): batch
+            for batch in reversed(batches)
+        }
+        out: Optional[np.ndarray] = None
+        done = as_completed(futures)
+        for future in tqdm(done, total=len(futures), desc="Embedding texts"):
+            vectors = future.result()
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[futures[future]] = vectors
+        return out  # type: ignore[return-value]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
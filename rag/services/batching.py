@@ -0,0 +1,23 @@
+from typing import Iterator, List, Sequence
+
+
+def length_buckets(
+    lengths: Sequence[int], token_budget: int, max_batch_size: int
+) -> Iterator[List[int]]:
+    """
+    Indices sorted by length, split into batches whose size times longest length (the padded
+    token count) stays within `token_budget`, with at most `max_batch_size` items. Short
+    items end up in large batches, long ones in small batches. An item longer than the
+    budget gets a batch of its own.
+    """
+    batch: List[int] = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        # Ascending order: the item being added is always the longest of the batch
+        if batch and (
+            len(batch) >= max_batch_size or (len(batch) + 1) * lengths[i] > token_budget
+        ):
+            yield batch
+            batch = []
+        batch.append(i)
+    if batch:
+        yield batch
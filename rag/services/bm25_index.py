@@ -0,0 +1,594 @@
+from __future__ import annotations
+
+import mmap
+import sys
+import itertools
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Same floor as rank_bm25.BM25Okapi: negative IDFs (terms in more than half of the
+# documents) are replaced by EPSILON * average IDF.
+EPSILON = 0.25
+# Field code of documents without a value for the field
+_NO_VALUE = -1
+_MASK_CACHE_SIZE = 256
+# Length normalizations (n_docs floats each) kept per index version: k1/b come from
+# requests, so the number of distinct ones is bounded here rather than by clients
+_NORM_CACHE_SIZE = 8
+_index_uids = itertools.count()
+
+
+def _heap_nbytes(array: np.ndarray) -> int:
+    """Bytes of `array` held in process memory: memory-mapped arrays live in the page cache."""
+    base = array
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return 0
+        base = getattr(base, "base", None)
+    return array.nbytes
+
+
+def _strings_nbytes(strings: Iterable[str]) -> int:
+    return sum(sys.getsizeof(s) for s in strings)
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    """Immutable view of the index used by one query, so scoring runs outside the lock."""
+
+    postings: sparse.csc_matrix  # shape (n_docs, n_terms), term frequencies, term-major
+    doc_len: np.ndarray  # float32, shape (n_docs,)
+    doc_ids: List[str]
+    vocabulary: Dict[str, int]
+    idf: np.ndarray  # float32, shape (n_terms,)
+    field_codes: Dict[str, np.ndarray]  # field -> int32 value code per document
+    field_values: Dict[str, Dict[str, int]]  # field -> value -> code
+    version: int
+
+
+@dataclass(frozen=True)
+class CorpusStats:
+    """
+    Term statistics of several indexes taken as one corpus (see `merge_corpus_stats`), so
+    that their BM25 scores are comparable: IDF and average document length are corpus-wide.
+    """
+
+    idf: Dict[str, float]
+    avgdl: float
+    n_docs: int
+
+
+@dataclass(frozen=True)
+class _PendingBlock:
+    """Documents added since the last merge, already encoded as (row, term id, tf) triplets."""
+
+    doc_ids: List[str]
+    rows: np.ndarray  # int32, row within the block
+    cols: np.ndarray  # int32, term id
+    tf: np.ndarray  # float32
+    doc_len: np.ndarray  # float32
+    field_codes: Dict[str, np.ndarray]  # int32, one code per document
+
+
+class BM25Index:
+    """
+    Okapi BM25 (same scoring as rank_bm25.BM25Okapi) over a sparse term-document matrix.
+
+    The corpus is stored term-major (CSC, i.e. one postings list per term) with precomputed
+    IDF and per-(k1, b) document length normalization. A query only touches the postings of
+    its own terms: they are weighted in one vectorized pass and reduced to document scores
+    with a sparse matrix-vector product, and the top-k is selected with `argpartition`.
+
+    Documents can be added and removed incrementally. Changes are buffered and merged into
+    the matrix (vectorized, no re-tokenization) on the next query.
+
+    Metadata `fields` are stored as one value code per document. A `where` filter
+    (field -> accepted values) becomes a document mask, cached per index version, and a
+    filtered query only weights the postings of matching documents.
+    """
+
+    def __init__(self, fields: Sequence[str] = ()):
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self._field_values: Dict[str, Dict[str, int]] = {f: {} for f in self.fields}
+        self._field_codes: Dict[str, np.ndarray] = {
+            f: np.zeros(0, dtype=np.int32) for f in self.fields
+        }
+        self._mask_cache: Dict[Tuple[int, tuple], np.ndarray] = {}
+        self.uid = next(_index_uids)  # with `version`, identifies the index contents
+        self._lock = threading.Lock()
+        self._vocabulary: Dict[str, int] = {}
+        self._postings = sparse.csc_matrix((0, 0), dtype=np.float32)
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._doc_ids: List[str] = []
+        self._pending: List[_PendingBlock] = []
+        self._removed: set = set()
+        self._version = 0
+        self._state: Optional[_IndexState] = None
+        self._norm_cache: Dict[tuple, np.ndarray] = {}
+        # ((version, vocabulary size), bytes of the merged arrays, ids and vocabulary)
+        self._memory: Optional[Tuple[Tuple[int, int], int]] = None
+
+    # ----- mutation -----
+
+    def add(
+        self,
+        doc_ids: Iterable[str],
+        token_lists: Iterable[Sequence[str]],
+        metadatas: Optional[Iterable[Optional[Mapping]]] = None,
+    ) -> None:
+        """
+        Add (or replace) documents. Tokens are encoded into compact term id / frequency arrays
+        right away, so callers can stream a corpus batch by batch without keeping token lists.
+        Values of the index `fields` are read from `metadatas` (one mapping per document).
+        """
+        ids: List[str] = []
+        rows: List[int] = []
+        cols: List[int] = []
+        data: List[int] = []
+        lengths: List[int] = []
+        codes: Dict[str, List[int]] = {f: [] for f in self.fields}
+        metas = iter(metadatas) if metadatas is not None else None
+        with self._lock:
+            vocabulary = self._vocabulary
+            for row, (doc_id, tokens) in enumerate(zip(doc_ids, token_lists)):
+                ids.append(doc_id)
+                lengths.append(len(tokens))
+                meta = (next(metas, None) if metas is not None else None) or {}
+                for field in self.fields:
+                    value = meta.get(field)
+                    if value is None:
+                        codes[field].append(_NO_VALUE)
+                    else:
+                        values = self._field_values[field]
+                        codes[field].append(values.setdefault(str(value), len(values)))
+                for term, tf in Counter(tokens).items():
+                    col = vocabulary.get(term)
+                    if col is None:
+                        col = vocabulary[term] = len(vocabulary)
+                    rows.append(row)
+                    cols.append(col)
+                    data.append(tf)
+            if not ids:
+                return
+            self._removed.difference_update(ids)
+            self._pending.append(
+                _PendingBlock(
+                    doc_ids=ids,
+                    rows=np.asarray(rows, dtype=np.int32),
+                    cols=np.asarray(cols, dtype=np.int32),
+                    tf=np.asarray(data, dtype=np.float32),
+                    doc_len=np.asarray(lengths, dtype=np.float32),
+                    field_codes={
+                        f: np.asarray(c, dtype=np.int32) for f, c in codes.items()
+                    },
+                )
+            )
+            self._state = None
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._removed.update(doc_ids)
+            self._state = None
+
+    def __len__(self) -> int:
+        return len(self._current_state().doc_ids)
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever merged changes alter the indexed documents."""
+        return self._current_state().version
+
+    def term_statistics(self) -> Tuple[int, float, Dict[str, int]]:
+        """(number of documents, total document length, document frequency of every term)."""
+        state = self._current_state()
+        df = np.diff(state.postings.indptr)
+        return (
+            len(state.doc_ids),
+            float(state.doc_len.sum()),
+            {term: int(df[col]) for term, col in state.vocabulary.items() if df[col]},
+        )
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate process memory held by the index: postings, lengths, ids, vocabulary,
+        cached normalizations and pending changes. Memory-mapped arrays are not counted.
+        Does not merge pending changes; the merged part is measured once per version.
+        """
+        with self._lock:
+            key = (self._version, len(self._vocabulary))
+            if self._memory is None or self._memory[0] != key:
+                postings = self._postings
+                merged = (
+                    _heap_nbytes(postings.data)
+                    + _heap_nbytes(postings.indices)
+                    + _heap_nbytes(postings.indptr)
+                    + _heap_nbytes(self._doc_len)
+                    + sys.getsizeof(self._doc_ids)
+                    + _strings_nbytes(self._doc_ids)
+                    + sys.getsizeof(self._vocabulary)
+                    + _strings_nbytes(self._vocabulary)
+                    + sum(_heap_nbytes(c) for c in self._field_codes.values())
+                    + sum(_strings_nbytes(v) for v in self._field_values.values())
+                )
+                self._memory = (key, merged)
+            total = self._memory[1]
+            total += sum(norm.nbytes for norm in self._norm_cache.values())
+            total += sum(mask.nbytes for mask in self._mask_cache.values())
+            if self._state is not None:
+                total += self._state.idf.nbytes + sys.getsizeof(self._state.vocabulary)
+            for block in self._pending:
+                total += (
+                    block.rows.nbytes
+                    + block.cols.nbytes
+                    + block.tf.nbytes
+                    + block.doc_len.nbytes
+                    + sum(c.nbytes for c in block.field_codes.values())
+                    + _strings_nbytes(block.doc_ids)
+                )
+            return total
+
+    # ----- persistence -----
+
+    def export(self) -> Tuple[sparse.csc_matrix, np.ndarray, List[str], List[str]]:
+        """(postings, doc lengths, doc ids, terms ordered by term id) with all changes merged."""
+        state = self._current_state()
+        terms = [""] * len(state.vocabulary)
+        for term, col in state.vocabulary.items():
+            terms[col] = term
+        return state.postings, state.doc_len, state.doc_ids, terms
+
+    def export_fields(self) -> Dict[str, Tuple[List[str], np.ndarray]]:
+        """field -> (values ordered by code, value code of every document)."""
+        state = self._current_state()
+        exported = {}
+        for field in self.fields:
+            values = [""] * len(state.field_values[field])
+            for value, code in state.field_values[field].items():
+                values[code] = value
+            exported[field] = (values, state.field_codes[field])
+        return exported
+
+    @classmethod
+    def from_arrays(
+        cls,
+        postings: sparse.csc_matrix,
+        doc_len: np.ndarray,
+        doc_ids: List[str],
+        terms: List[str],
+        fields: Optional[Mapping[str, Tuple[List[str], np.ndarray]]] = None,
+    ) -> "BM25Index":
+        """Build an index around existing arrays (e.g. memory-mapped ones) without copying them."""
+        fields = fields or {}
+        index = cls(fields=list(fields))
+        index._postings = postings
+        index._doc_len = doc_len
+        index._doc_ids = list(doc_ids)
+        index._vocabulary = {term: col for col, term in enumerate(terms)}
+        for field, (values, codes) in fields.items():
+            index._field_values[field] = {value: code for code, value in enumerate(values)}
+            index._field_codes[field] = codes
+        return index
+
+    # ----- building -----
+
+    def _merge_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        removed, self._removed = self._removed, set()
+        n_terms = len(self._vocabulary)
+
+        new_ids: List[str] = [doc_id for block in pending for doc_id in block.doc_ids]
+        # Re-added ids replace their previous version, and only the last add of an id counts
+        last_row = {doc_id: row for row, doc_id in enumerate(new_ids)}
+        new_keep = np.fromiter(
+            (
+                last_row[doc_id] == row and doc_id not in removed
+                for row, doc_id in enumerate(new_ids)
+            ),
+            dtype=bool,
+            count=len(new_ids),
+        )
+
+        dropped = removed | last_row.keys()
+        postings, doc_len, doc_ids = self._postings, self._doc_len, self._doc_ids
+        field_codes = self._field_codes
+        if dropped and any(doc_id in dropped for doc_id in doc_ids):
+            keep = np.fromiter(
+                (doc_id not in dropped for doc_id in doc_ids),
+                dtype=bool,
+                count=len(doc_ids),
+            )
+            postings = postings.tocsr()[keep].tocsc()
+            doc_len = doc_len[keep]
+            doc_ids = [d for d, k in zip(doc_ids, keep) if k]
+            field_codes = {f: codes[keep] for f, codes in field_codes.items()}
+
+        # Widen to the current vocabulary without touching the matrix in-flight queries use
+        postings = sparse.csc_matrix(
+            (
+                postings.data,
+                postings.indices,
+                np.concatenate(
+                    [
+                        postings.indptr,
+                        np.full(n_terms - postings.shape[1], postings.indptr[-1]),
+                    ]
+                ),
+            ),
+            shape=(postings.shape[0], n_terms),
+        )
+
+        if new_ids:
+            offsets = np.cumsum([0] + [len(block.doc_ids) for block in pending])
+            block = sparse.csr_matrix(
+                (
+                    np.concatenate([b.tf for b in pending]),
+                    (
+                        np.concatenate(
+                            [b.rows.astype(np.int64) + o for b, o in zip(pending, offsets)]
+                        ),
+                        np.concatenate([b.cols for b in pending]).astype(np.int64),
+                    ),
+                ),
+                shape=(len(new_ids), n_terms),
+                dtype=np.float32,
+            )[new_keep]
+            postings = sparse.vstack([postings, block], format="csc", dtype=np.float32)
+            doc_len = np.concatenate(
+                [doc_len, np.concatenate([b.doc_len for b in pending])[new_keep]]
+            )
+            doc_ids = doc_ids + [d for d, k in zip(new_ids, new_keep) if k]
+            field_codes = {
+                f: np.concatenate(
+                    [codes] + [b.field_codes[f] for b in pending]
+                )[np.concatenate([np.ones(len(codes), dtype=bool), new_keep])]
+                for f, codes in field_codes.items()
+            }
+
+        postings.sort_indices()
+        self._postings, self._doc_len, self._doc_ids = postings, doc_len, doc_ids
+        self._field_codes = field_codes
+        self._version += 1
+        self._norm_cache.clear()
+        self._mask_cache.clear()
+
+    @staticmethod
+    def _compute_idf(postings: sparse.csc_matrix) -> np.ndarray:
+        n_docs = postings.shape[0]
+        df = np.diff(postings.indptr).astype(np.float64)
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        present = df > 0
+        if present.any():
+            average_idf = idf[present].mean()
+            idf[present & (idf < 0)] = EPSILON * average_idf
+        return idf.astype(np.float32)
+
+    def _current_state(self) -> _IndexState:
+        with self._lock:
+            if self._state is None:
+                if self._pending or self._removed:
+                    self._merge_pending()
+                self._state = _IndexState(
+                    postings=self._postings,
+                    doc_len=self._doc_len,
+                    doc_ids=self._doc_ids,
+                    vocabulary=dict(self._vocabulary),
+                    idf=self._compute_idf(self._postings),
+                    field_codes=self._field_codes,
+                    field_values={f: dict(v) for f, v in self._field_values.items()},
+                    version=self._version,
+                )
+            return self._state
+
+    def _length_norm(
+        self, state: _IndexState, k1: float, b: float, avgdl: Optional[float] = None
+    ) -> np.ndarray:
+        """k1 * (1 - b + b * |d| / avgdl) for every document, cached per index version."""
+        key = (state.version, k1, b, avgdl)
+        norm = self._norm_cache.get(key)
+        if norm is None:
+            if avgdl is None:
+                avgdl = float(state.doc_len.mean()) if len(state.doc_len) else 0.0
+            norm = (k1 * (1.0 - b + b * state.doc_len / max(avgdl, 1e-9))).astype(
+                np.float32
+            )
+            # Under the lock: memory_bytes iterates the caches
+            with self._lock:
+                if len(self._norm_cache) >= _NORM_CACHE_SIZE:
+                    self._norm_cache.clear()
+                self._norm_cache[key] = norm
+        return norm
+
+    # ----- filtering -----
+
+    def _where_mask(
+        self, state: _IndexState, where: Mapping[str, Sequence[str]]
+    ) -> np.ndarray:
+        """Documents matching every field of `where` (any of the field's values)."""
+        key = tuple(sorted((f, tuple(sorted(map(str, v)))) for f, v in where.items()))
+        cache_key = (state.version, key)
+        mask = self._mask_cache.get(cache_key)
+        if mask is not None:
+            return mask
+        mask = np.ones(len(state.doc_ids), dtype=bool)
+        for field, values in key:
+            if field not in state.field_codes:
+                raise ValueError(
+                    f"Field '{field}' is not indexed for filtering (indexed: {list(self.fields)})"
+                )
+            known = state.field_values[field]
+            wanted = np.fromiter(
+                (known[v] for v in values if v in known), dtype=np.int32
+            )
+            mask &= np.isin(state.field_codes[field], wanted)
+        with self._lock:
+            if len(self._mask_cache) >= _MASK_CACHE_SIZE:
+                self._mask_cache.clear()
+            self._mask_cache[cache_key] = mask
+        return mask
+
+    def ids_where(self, field: str, values: Iterable[str]) -> List[str]:
+        """Ids of the documents whose `field` is one of `values`."""
+        state = self._current_state()
+        mask = self._where_mask(state, {field: list(values)})
+        return [state.doc_ids[i] for i in np.flatnonzero(mask)]
+
+    # ----- querying -----
+
+    def _scores(
+        self,
+        state: _IndexState,
+        query_tokens: Sequence[str],
+        k1: float,
+        b: float,
+        where: Optional[Mapping[str, Sequence[str]]] = None,
+        corpus: Optional[CorpusStats] = None,
+    ) -> np.ndarray:
+        n_docs = len(state.doc_ids)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        if n_docs == 0:
+            return scores
+
+        query_tf = Counter(
+            state.vocabulary[t] for t in query_tokens if t in state.vocabulary
+        )
+        if not query_tf:
+            return scores
+        cols = np.fromiter(query_tf.keys(), dtype=np.int64, count=len(query_tf))
+        if corpus is None:
+            idf = state.idf[cols]
+        else:
+            terms = {state.vocabulary[t]: t for t in query_tokens if t in state.vocabulary}
+            idf = np.fromiter(
+                (corpus.idf.get(terms[col], 0.0) for col in query_tf),
+                dtype=np.float32,
+                count=len(query_tf),
+            )
+        query_weights = idf * np.fromiter(
+            query_tf.values(), dtype=np.float32, count=len(query_tf)
+        )
+
+        norm = self._length_norm(
+            state, k1, b, corpus.avgdl if corpus is not None else None
+        )
+        if where:
+            return self._filtered_scores(
+                state, cols, query_weights, norm, k1, self._where_mask(state, where)
+            )
+        # Saturated term frequencies of the query terms' postings only
+        sub = state.postings[:, cols]
+        tf = sub.data
+        weighted = sparse.csc_matrix(
+            (tf * (k1 + 1.0) / (tf + norm[sub.indices]), sub.indices, sub.indptr),
+            shape=sub.shape,
+        )
+        return np.asarray(weighted @ query_weights, dtype=np.float32).ravel()
+
+    @staticmethod
+    def _filtered_scores(
+        state: _IndexState,
+        cols: np.ndarray,
+        query_weights: np.ndarray,
+        norm: np.ndarray,
+        k1: float,
+        mask: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Scores of the documents in `mask` (0 elsewhere). A term whose postings outnumber
+        the matching documents by more than a binary search over them costs looks the
+        matching documents up in its (sorted) postings instead of scanning them all.
+        """
+        postings = state.postings
+        scores = np.zeros(len(state.doc_ids), dtype=np.float32)
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return scores
+        sorted_postings = postings.has_sorted_indices
+        for weight, col in zip(query_weights, cols):
+            start, end = postings.indptr[col], postings.indptr[col + 1]
+            col_rows = postings.indices[start:end]
+            col_tf = postings.data[start:end]
+            if col_rows.size == 0:
+                continue
+            if sorted_postings and rows.size * np.log2(col_rows.size + 1) < col_rows.size:
+                pos = np.searchsorted(col_rows, rows)
+                found = pos < col_rows.size
+                found[found] = col_rows[pos[found]] == rows[found]
+                doc_rows, tf = rows[found], col_tf[pos[found]]
+            else:
+                selected = mask[col_rows]
+                doc_rows, tf = col_rows[selected], col_tf[selected]
+            scores[doc_rows] += tf * (k1 + 1.0) / (tf + norm[doc_rows]) * weight
+        return scores
+
+    def get_scores(
+        self,
+        query_tokens: Sequence[str],
+        k1: float,
+        b: float,
+        where: Optional[Mapping[str, Sequence[str]]] = None,
+        corpus: Optional[CorpusStats] = None,
+    ) -> np.ndarray:
+        """BM25 score of every document for the query (0 outside `where`), shape (n_docs,)."""
+        return self._scores(self._current_state(), query_tokens, k1, b, where, corpus)
+
+    def top_k(
+        self,
+        query_tokens: Sequence[str],
+        k: int,
+        k1: float,
+        b: float,
+        where: Optional[Mapping[str, Sequence[str]]] = None,
+        corpus: Optional[CorpusStats] = None,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        The k best (doc id, score) pairs among the documents matching `where`, best first,
+        like rank_bm25's get_top_n: zero or negative scores (small collections, terms in
+        most documents) still rank. `min_score` drops documents scoring below it. With
+        `corpus`, IDF and average document length come from those corpus-wide statistics
+        instead of this index.
+        """
+        state = self._current_state()
+        if k <= 0:
+            return []
+        scores = self._scores(state, query_tokens, k1, b, where, corpus)
+        if where:
+            candidates = np.flatnonzero(self._where_mask(state, where))
+        else:
+            candidates = np.arange(len(scores))
+        if min_score is not None:
+            candidates = candidates[scores[candidates] >= min_score]
+        if candidates.size == 0:
+            return []
+        if candidates.size > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(state.doc_ids[i], float(scores[i])) for i in order]
+
+
+def merge_corpus_stats(indexes: Sequence[BM25Index]) -> CorpusStats:
+    """Corpus-wide IDF (same formula and floor as a single index) and average length."""
+    n_docs, total_len = 0, 0.0
+    df: Counter = Counter()
+    for index in indexes:
+        n, length, frequencies = index.term_statistics()
+        n_docs += n
+        total_len += length
+        df.update(frequencies)
+    if not df:
+        return CorpusStats(idf={}, avgdl=0.0, n_docs=n_docs)
+    terms = list(df)
+    freq = np.fromiter(df.values(), dtype=np.float64, count=len(terms))
+    idf = np.log(n_docs - freq + 0.5) - np.log(freq + 0.5)
+    idf[idf < 0] = EPSILON * idf.mean()
+    return CorpusStats(
+        idf=dict(zip(terms, idf.astype(np.float32).tolist())),
+        avgdl=total_len / max(n_docs, 1),
+        n_docs=n_docs,
+    )
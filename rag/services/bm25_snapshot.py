@@ -0,0 +1,187 @@
+"""
+On-disk BM25 index snapshots, stored next to the Chroma data:
+
+    <RAG.VectorStore.path>/bm25/<collection>.generation     generation marker (integer)
+    <RAG.VectorStore.path>/bm25/<collection>.lock           serializes generation bumps
+    <RAG.VectorStore.path>/bm25/<collection>/meta.json      format, generation, counts, tokenizer,
+                                                            indexed metadata fields
+    <RAG.VectorStore.path>/bm25/<collection>/terms.json     vocabulary, ordered by term id
+    <RAG.VectorStore.path>/bm25/<collection>/doc_ids.json   row -> Chroma document id
+    <RAG.VectorStore.path>/bm25/<collection>/fields.json    field -> values, ordered by code
+    <RAG.VectorStore.path>/bm25/<collection>/*.npy          postings (CSC), document lengths and
+                                                            field value codes (field_<i>.npy)
+
+The .npy arrays are loaded with mmap, so a cold start only reads the postings a query touches.
+Every write to a collection through the RAG service bumps its generation marker; a snapshot is
+only used when its generation and document count still match the collection.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+from config.index import config
+from core.logging import logger
+from scipy import sparse
+from services.bm25_index import BM25Index
+
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_ROOT = Path(config.RAG.VectorStore.path) / "bm25"
+
+
+def _snapshot_dir(collection_name: str) -> Path:
+    return SNAPSHOT_ROOT / collection_name
+
+
+def _generation_file(collection_name: str) -> Path:
+    return SNAPSHOT_ROOT / f"{collection_name}.generation"
+
+
+def read_generation(collection_name: str) -> int:
+    try:
+        return int(_generation_file(collection_name).read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_generation(collection_name: str) -> int:
+    """Mark every existing snapshot of the collection as stale. Returns the new generation."""
+    SNAPSHOT_ROOT.mkdir(parents=True, exist_ok=True)
+    # Concurrent writers (threads or service processes) would otherwise read the same value
+    # and both write its successor, leaving a snapshot of one write looking current
+    with open(SNAPSHOT_ROOT / f"{collection_name}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            generation = read_generation(collection_name) + 1
+            tmp = _generation_file(collection_name).with_suffix(f".tmp-{os.getpid()}")
+            tmp.write_text(str(generation))
+            os.replace(tmp, _generation_file(collection_name))
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return generation
+
+
+def save_snapshot(
+    collection_name: str,
+    index: BM25Index,
+    *,
+    generation: int,
+    tokenizer: str,
+) -> None:
+    postings, doc_len, doc_ids, terms = index.export()
+    fields = index.export_fields()
+    target = _snapshot_dir(collection_name)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    # indptr and indices must share a dtype, or scipy copies them when loading
+    index_dtype = np.int32 if postings.nnz < np.iinfo(np.int32).max else np.int64
+    np.save(tmp / "indptr.npy", postings.indptr.astype(index_dtype))
+    np.save(tmp / "indices.npy", postings.indices.astype(index_dtype))
+    np.save(tmp / "tf.npy", postings.data.astype(np.float32))
+    np.save(tmp / "doc_len.npy", doc_len.astype(np.float32))
+    with open(tmp / "terms.json", "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    with open(tmp / "doc_ids.json", "w", encoding="utf-8") as f:
+        json.dump(doc_ids, f, ensure_ascii=False)
+    for i, (_, codes) in enumerate(fields.values()):
+        np.save(tmp / f"field_{i}.npy", codes.astype(np.int32))
+    with open(tmp / "fields.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {field: values for field, (values, _) in fields.items()}, f, ensure_ascii=False
+        )
+    # meta.json is written last: a snapshot without it is incomplete and ignored
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": SNAPSHOT_FORMAT,
+                "generation": generation,
+                "count": len(doc_ids),
+                "n_terms": len(terms),
+                "tokenizer": tokenizer,
+                "fields": list(fields),
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    old = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    logger.info(
+        f"[RAG] Saved BM25 snapshot of '{collection_name}' "
+        f"({len(doc_ids)} documents, generation {generation})"
+    )
+
+
+def load_snapshot(
+    collection_name: str,
+    *,
+    expected_count: int,
+    tokenizer: str,
+    fields: Sequence[str],
+) -> Optional[BM25Index]:
+    """Load a valid snapshot, or return None if it is missing, stale or unreadable."""
+    target = _snapshot_dir(collection_name)
+    try:
+        with open(target / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[RAG] Unreadable BM25 snapshot of '{collection_name}': {e}")
+        return None
+
+    generation = read_generation(collection_name)
+    if (
+        meta.get("format") != SNAPSHOT_FORMAT
+        or meta.get("generation") != generation
+        or meta.get("count") != expected_count
+        or meta.get("tokenizer") != tokenizer
+        or meta.get("fields") != list(fields)
+    ):
+        logger.info(
+            f"[RAG] Stale BM25 snapshot of '{collection_name}' "
+            f"(snapshot {meta}, current generation {generation}, count {expected_count}, "
+            f"tokenizer {tokenizer}, fields {list(fields)})"
+        )
+        return None
+
+    try:
+        indptr = np.load(target / "indptr.npy", mmap_mode="r")
+        indices = np.load(target / "indices.npy", mmap_mode="r")
+        tf = np.load(target / "tf.npy", mmap_mode="r")
+        doc_len = np.load(target / "doc_len.npy", mmap_mode="r")
+        with open(target / "terms.json", encoding="utf-8") as f:
+            terms = json.load(f)
+        with open(target / "doc_ids.json", encoding="utf-8") as f:
+            doc_ids = json.load(f)
+        with open(target / "fields.json", encoding="utf-8") as f:
+            field_values = json.load(f)
+        field_arrays = {
+            field: (
+                field_values[field],
+                np.load(target / f"field_{i}.npy", mmap_mode="r"),
+            )
+            for i, field in enumerate(meta["fields"])
+        }
+        postings = sparse.csc_matrix(
+            (tf, indices, indptr), shape=(len(doc_ids), len(terms)), copy=False
+        )
+        postings.has_sorted_indices = True  # written sorted; avoids a full scan
+    except Exception as e:
+        logger.warning(f"[RAG] Failed to load BM25 snapshot of '{collection_name}': {e}")
+        return None
+
+    logger.info(
+        f"[RAG] Loaded BM25 snapshot of '{collection_name}' "
+        f"({len(doc_ids)} documents, generation {generation})"
+    )
+    return BM25Index.from_arrays(postings, doc_len, doc_ids, terms, field_arrays)
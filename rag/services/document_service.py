@@ -1,7 +1,9 @@
 from config.index import config
 from core.logging import logger
 from models.schemas import DeleteRequest, DeleteResponseModel
-from repositories.chroma_repository import chroma_db
+from repositories.chroma_repository import COLLECTION_NOT_FOUND, chroma_db
+from services.HybridRAGEngineFactory import hybrid_RAG_engine_factory
+from services.page_store import page_store
 
 
 def delete_collection(req: DeleteRequest) -> DeleteResponseModel:
@@ -21,6 +23,11 @@ def delete_collection(req: DeleteRequest) -> DeleteResponseModel:
             collection.delete(
                 where={"file_id": {"$in": req.ids}},  # type: ignore
             )
+            hybrid_RAG_engine_factory.on_documents_deleted(
+                config.RAG.PreProcess.PDF.splitByArticle.collectionName,
+                "file_id",
+                req.ids,
+            )
 
             if config.APP_MODE == "development":
                 res_2 = collection.get(where={"file_id": {"$in": req.ids}})  # type: ignore
@@ -45,14 +52,22 @@ def delete_collection(req: DeleteRequest) -> DeleteResponseModel:
                 collection=config.RAG.PreProcess.PDF.splitByArticle.collectionName,
             )
 
-    target = []
-    for col in chroma_db.list_collections():
-        meta = getattr(col, "metadata", None) or {}
-        if meta.get("name") == req.collection_name:
-            target.append(col.name)
+    deleted_chunks = page_store.delete_by_name(req.collection_name)
+    if deleted_chunks:
+        logger.info(
+            f"Deleted {deleted_chunks} page store chunks of collection: {req.collection_name}"
+        )
+
+    target = chroma_db.find_collections_by_metadata("name", req.collection_name)
     if not target:
+        if deleted_chunks:
+            return DeleteResponseModel(status="deleted", collection=req.collection_name)
         return DeleteResponseModel(status="no match", collection=req.collection_name)
 
     for name in target:
-        chroma_db.delete_collection(name=name)
+        try:
+            chroma_db.delete_collection(name=name)
+        except COLLECTION_NOT_FOUND:
+            # Already deleted by another process (e.g. migrate_page_store --delete-source)
+            logger.info(f"Collection {name} no longer exists, skipping")
     return DeleteResponseModel(status="deleted", collection=req.collection_name)
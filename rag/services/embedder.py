@@ -1,26 +1,66 @@
+import json
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
 
 import jaconv
-import torch
+import numpy as np
 from config.index import config
 from config.schema import HFModelConfig, OllamaModelConfig
 from core.logging import logger
-from huggingface_hub import snapshot_download
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_ollama import OllamaEmbeddings
-
-CUDA_AVAILABLE = torch.cuda.is_available()
-if config.RAG.Retrieval.throwErrorWhenCUDAUnavailable:
-    if not CUDA_AVAILABLE:
-        raise RuntimeError(
-            "CUDA is not available, if you want to run on CPU, "
-            "please set throwErrorWhenCUDAUnavailable to false in the config file."
-        )
-    EMBEDDING_MODEL_DEVICE = "cuda"
-else:
-    EMBEDDING_MODEL_DEVICE = "cuda" if CUDA_AVAILABLE else "cpu"
-logger.info(f"Embedding model device: {EMBEDDING_MODEL_DEVICE}")
+from core.metrics import metrics
+from core.readiness import readiness
+from langchain_core.embeddings import Embeddings
+from services.batch_embedder import BatchEmbedder
+from services.embedding_cache import EmbeddingCache, text_digest
+from services.model_files import (
+    CONVERT_TO_SAFETENSORS,
+    PICKLE_WEIGHTS,
+    SAFETENSORS_WEIGHTS,
+    ensure_safetensors,
+)
+
+ENCODE_KWARGS = {"normalize_embeddings": True}
+# Content-addressed vector cache (memory LRU in front of a memory-mapped file per model)
+EMBEDDING_CACHE_ENABLED: bool = getattr(
+    config.RAG.Retrieval, "embeddingCacheEnabled", True
+)
+EMBEDDING_CACHE_MEMORY_ENTRIES: int = int(
+    getattr(config.RAG.Retrieval, "embeddingCacheMemoryEntries", 10000)
+)
+EMBEDDING_CACHE_PATH: Path = Path(
+    getattr(config.RAG.Retrieval, "embeddingCachePath", None)
+    or Path(config.RAG.VectorStore.path) / "embedding_cache"
+)
+# Ingestion batches: texts sorted by length, padded tokens per batch under the budget
+EMBEDDING_BATCH_TOKEN_BUDGET: int = int(
+    getattr(config.RAG.Retrieval, "embeddingBatchTokenBudget", 16384)
+)
+EMBEDDING_BATCH_MAX_SIZE: int = int(
+    getattr(config.RAG.Retrieval, "embeddingBatchMaxSize", 64)
+)
+# Processes embedding ingestion batches, each with its own model copy (1: in-process)
+EMBEDDING_WORKERS: int = int(getattr(config.RAG.Retrieval, "embeddingWorkers", 1))
+EMBEDDING_WORKER_THREADS: int = int(
+    getattr(config.RAG.Retrieval, "embeddingWorkerThreads", None)
+    or max(1, (os.cpu_count() or 1) // max(1, EMBEDDING_WORKERS))
+)
+
+
+def embedding_model_device() -> str:
+    # torch is imported here, not at module import: it is only needed to load the model
+    import torch
+
+    cuda_available = torch.cuda.is_available()
+    if config.RAG.Retrieval.throwErrorWhenCUDAUnavailable:
+        if not cuda_available:
+            raise RuntimeError(
+                "CUDA is not available, if you want to run on CPU, "
+                "please set throwErrorWhenCUDAUnavailable to false in the config file."
+            )
+        return "cuda"
+    return "cuda" if cuda_available else "cpu"
 
 
 def process_text(text):
@@ -37,7 +77,8 @@ def ensure_local_HF_model(
     model_files = [
         "config.json",
         "sentence_bert_config.json",
-        "pytorch_model.bin",
+        SAFETENSORS_WEIGHTS,
+        PICKLE_WEIGHTS,
         "tokenizer.json",
         "tokenizer_config.json",
     ]
@@ -50,36 +91,48 @@ def ensure_local_HF_model(
                 f"Model {model_name} not found in local cache at {model_dir}."
             )
         logger.info(f"Downloading embedding model {model_name} to local cache...")
+        from huggingface_hub import snapshot_download
+
         snapshot_download(
             repo_id=model_name, local_dir=model_dir, local_dir_use_symlinks=False
         )
         logger.info(f"Model {model_name} downloaded to: {model_dir}")
 
+    if CONVERT_TO_SAFETENSORS:
+        ensure_safetensors(model_dir)
     return str(model_dir)
 
 
+def hf_model_dir() -> str:
+    """Local directory of the HuggingFace embedding model, downloaded if missing."""
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("HF_HUB_DISABLE_TELEMETRY", "1")
+    return ensure_local_HF_model(
+        model_name=config.Models.ragEmbeddingModel.name,
+        cache_dir=config.Models.ragEmbeddingModel.cacheDir,
+    )
+
+
 def load_embeddings():
     if isinstance(config.Models.ragEmbeddingModel, HFModelConfig):
+        from langchain_huggingface import HuggingFaceEmbeddings
 
-        os.environ.setdefault("HF_HUB_OFFLINE", "1")
-        os.environ.setdefault("HF_HUB_DISABLE_TELEMETRY", "1")
-
-        model_dir = ensure_local_HF_model(
-            model_name=config.Models.ragEmbeddingModel.name,
-            cache_dir=config.Models.ragEmbeddingModel.cacheDir,
-        )
+        model_dir = hf_model_dir()
 
+        device = embedding_model_device()
+        logger.info(f"Embedding model device: {device}")
         emb = HuggingFaceEmbeddings(
             model_name=model_dir,
             model_kwargs={
-                "device": EMBEDDING_MODEL_DEVICE,
+                "device": device,
                 "local_files_only": True,
             },
-            encode_kwargs={"normalize_embeddings": True},
+            encode_kwargs=ENCODE_KWARGS,
         )
         return emb
 
     elif isinstance(config.Models.ragEmbeddingModel, OllamaModelConfig):
+        from langchain_ollama import OllamaEmbeddings
 
         ollama_base_url = config.Ollama.url[0] or None
         if not ollama_base_url:
@@ -96,17 +149,154 @@ def load_embeddings():
         raise NotImplementedError("Unsupported embedding model configuration.")
 
 
-embeddings = load_embeddings()
+def embedding_namespace() -> str:
+    """What a text's vector depends on besides the text: model and normalization."""
+    model = config.Models.ragEmbeddingModel
+    if isinstance(model, HFModelConfig):
+        return f"hf:{model.name}|{json.dumps(ENCODE_KWARGS, sort_keys=True)}"
+    return f"{type(model).__name__}:{model.name}"
+
+
+_embedding_cache: Optional[EmbeddingCache] = (
+    EmbeddingCache(
+        EMBEDDING_CACHE_PATH,
+        embedding_namespace(),
+        memory_entries=EMBEDDING_CACHE_MEMORY_ENTRIES,
+    )
+    if EMBEDDING_CACHE_ENABLED
+    else None
+)
+_cache_hits = metrics.counter("rag.embedding_cache.hits")
+_cache_misses = metrics.counter("rag.embedding_cache.misses")
+metrics.gauge(
+    "rag.embedding_cache.hit_rate",
+    lambda: round(
+        _cache_hits.value / max(1, _cache_hits.value + _cache_misses.value), 4
+    ),
+)
+metrics.gauge(
+    "rag.embedding_cache.entries",
+    lambda: len(_embedding_cache) if _embedding_cache is not None else 0,
+)
+
+
+def _cached_embed(
+    kind: str,
+    texts: List[str],
+    embed: Callable[[List[str]], Sequence[Sequence[float]]],
+) -> np.ndarray:
+    """
+    Vectors of `texts` as float32 rows, embedding only those not cached. Document vectors
+    are written to the on-disk cache, query vectors are kept in its memory LRU only.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    if _embedding_cache is None:
+        return np.asarray(embed(texts), dtype=np.float32)
+    digests = [text_digest(kind, text) for text in texts]
+    try:
+        vectors = _embedding_cache.get_many(digests)
+    except Exception as e:
+        logger.warning(f"[RAG] Embedding cache lookup failed: {e}")
+        return np.asarray(embed(texts), dtype=np.float32)
+
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    _cache_hits.inc(len(texts) - len(missing))
+    _cache_misses.inc(len(missing))
+    if not missing:
+        return np.stack(vectors)  # type: ignore[arg-type]
+    computed = np.asarray(embed([texts[i] for i in missing]), dtype=np.float32)
+    try:
+        _embedding_cache.put_many(
+            [digests[i] for i in missing], computed, persist=kind == "document"
+        )
+    except Exception as e:
+        logger.warning(f"[RAG] Embedding cache write failed: {e}")
+    if len(missing) == len(texts):
+        return computed
+    out = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+    out[missing] = computed
+    for i, vector in enumerate(vectors):
+        if vector is not None:
+            out[i] = vector
+    return out
+
+
+class _BackgroundEmbeddings(Embeddings):
+    """
+    Stands in for the embedding model while it loads in the background (core.readiness):
+    calls wait until the model is loaded, and load it on first use outside the API.
+    Vectors are looked up in the embedding cache first.
+    """
+
+    @staticmethod
+    def _model() -> Embeddings:
+        return readiness.get("embedding")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return _cached_embed(
+            "document", texts, lambda missing: self._model().embed_documents(missing)
+        ).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return _cached_embed(
+            "query",
+            [text],
+            lambda missing: [self._model().embed_query(t) for t in missing],
+        )[0].tolist()
+
+
+readiness.register("embedding", load_embeddings)
+embeddings = _BackgroundEmbeddings()
 
 embed_text = embeddings.embed_query
 
 
-def embed_text_batch(texts: list[str], batch_size: int = 16) -> list[list[float]]:
-    results = []
-    from tqdm import tqdm
+@lru_cache(maxsize=1)
+def _length_tokenizer():
+    """Tokenizer of the HuggingFace model, to batch texts by length (None: Ollama)."""
+    if not isinstance(config.Models.ragEmbeddingModel, HFModelConfig):
+        return None
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(hf_model_dir(), local_files_only=True)
+    except Exception as e:
+        logger.warning(
+            f"[RAG] Embedding tokenizer unavailable, batching by characters: {e}"
+        )
+        return None
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    """Tokens per text as the model sees them (truncated), else characters."""
+    tokenizer = _length_tokenizer()
+    if tokenizer is None:
+        return [len(text) for text in texts]
+    encoded = tokenizer(texts, truncation=True, add_special_tokens=True)
+    return [len(ids) for ids in encoded["input_ids"]]
+
+
+def _worker_args() -> Optional[Tuple[str, dict, int]]:
+    """What embedding workers load; None unless a local HF model runs on CPU."""
+    if not isinstance(config.Models.ragEmbeddingModel, HFModelConfig):
+        return None
+    if embedding_model_device() != "cpu":
+        # One GPU is not faster for being shared by several processes
+        return None
+    return hf_model_dir(), ENCODE_KWARGS, EMBEDDING_WORKER_THREADS
+
+
+batch_embedder = BatchEmbedder(
+    lambda texts: embeddings._model().embed_documents(texts),
+    count_tokens,
+    token_budget=EMBEDDING_BATCH_TOKEN_BUDGET,
+    max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+    workers=EMBEDDING_WORKERS,
+    worker_args=_worker_args,
+)
+
 
-    for i in tqdm(range(0, len(texts), batch_size), desc="Embedding texts"):
-        batch_texts = texts[i : i + batch_size]
-        batch_embeddings = embeddings.embed_documents(batch_texts)
-        results.extend(batch_embeddings)
-    return results
+def embed_text_batch(texts: list[str]) -> np.ndarray:
+    """Document vectors of `texts` for ingestion, in order, as float32 (n, dim)."""
+    return _cached_embed("document", texts, batch_embedder.embed)
@@ -0,0 +1,163 @@
+"""
+Content-addressed cache of embedding vectors, shared by ingest and query paths.
+
+Vectors are keyed by a hash of the text (and of how it was embedded: query or document),
+inside a directory per model and normalization:
+
+    <directory>/<namespace hash>/meta.json     namespace, dimension
+    <directory>/<namespace hash>/vectors.f32   float32 rows, append-only, memory-mapped
+    <directory>/<namespace hash>/index.bin     16-byte text digest per row, append-only
+
+Appends take an exclusive file lock, so several service processes can share the files; rows
+appended by another process become visible after a restart. A recently used in-memory LRU
+sits in front of the memory map; vectors put with `persist=False` (search queries, which are
+rarely repeated and would grow the files without bound) live in the LRU only.
+"""
+
+import fcntl
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from core.cache import LRUCache
+from core.logging import logger
+
+DIGEST_SIZE = 16
+
+
+def text_digest(kind: str, text: str) -> bytes:
+    return hashlib.blake2b(
+        f"{kind}\0{text}".encode("utf-8"), digest_size=DIGEST_SIZE
+    ).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, directory: Path, namespace: str, *, memory_entries: int):
+        self.namespace = namespace
+        self.path = directory / hashlib.blake2b(
+            namespace.encode("utf-8"), digest_size=8
+        ).hexdigest()
+        self._memory: LRUCache[np.ndarray] = LRUCache(memory_entries)
+        self._rows: Dict[bytes, int] = {}
+        self._vectors: Optional[np.ndarray] = None  # memory map of the rows known so far
+        self._dim: Optional[int] = None
+        self._lock = threading.Lock()
+        self._opened = False
+
+    def _open(self) -> None:
+        """Load the index and map the vectors (once)."""
+        if self._opened:
+            return
+        self._opened = True
+        meta_file = self.path / "meta.json"
+        if not meta_file.exists():
+            return
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            self._dim = int(meta["dim"])
+            digests = (self.path / "index.bin").read_bytes()
+            n = min(len(digests) // DIGEST_SIZE, self._file_rows())
+            self._rows = {
+                digests[i * DIGEST_SIZE : (i + 1) * DIGEST_SIZE]: i for i in range(n)
+            }
+            self._map()
+        except Exception as e:
+            logger.warning(
+                f"[RAG] Embedding cache at {self.path} unreadable, starting empty: {e}"
+            )
+            self._rows, self._vectors, self._dim = {}, None, None
+
+    def _file_rows(self) -> int:
+        vectors_file = self.path / "vectors.f32"
+        if self._dim is None or not vectors_file.exists():
+            return 0
+        return vectors_file.stat().st_size // (self._dim * 4)
+
+    def _map(self) -> None:
+        """(Re)map every complete row currently in the vectors file."""
+        n = self._file_rows()
+        self._vectors = (
+            np.memmap(
+                self.path / "vectors.f32",
+                dtype=np.float32,
+                mode="r",
+                shape=(n, self._dim),  # type: ignore[arg-type]
+            )
+            if n
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, digests: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        found: List[Optional[np.ndarray]] = []
+        with self._lock:
+            self._open()
+            for digest in digests:
+                vector = self._memory.get(digest)
+                if vector is None:
+                    row = self._rows.get(digest)
+                    if row is not None:
+                        if self._vectors is None or row >= len(self._vectors):
+                            self._map()
+                        vector = np.array(self._vectors[row])  # type: ignore[index]
+                        self._memory.put(digest, vector)
+                found.append(vector)
+        return found
+
+    def put_many(
+        self,
+        digests: Sequence[bytes],
+        vectors: Sequence[Sequence[float]],
+        *,
+        persist: bool = True,
+    ) -> None:
+        if not digests:
+            return
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._open()
+            for digest, vector in zip(digests, matrix):
+                # A copy: a row view would keep the whole batch matrix alive in the LRU
+                self._memory.put(digest, vector.copy())
+            if not persist:
+                return
+            new = [i for i, digest in enumerate(digests) if digest not in self._rows]
+            if not new:
+                return
+            if self._dim is None:
+                self._dim = matrix.shape[1]
+                self.path.mkdir(parents=True, exist_ok=True)
+                (self.path / "meta.json").write_text(
+                    json.dumps({"namespace": self.namespace, "dim": self._dim}),
+                    encoding="utf-8",
+                )
+            if matrix.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {matrix.shape[1]} does not match "
+                    f"the cache ({self._dim})"
+                )
+            with open(self.path / "index.bin", "ab") as index:
+                fcntl.flock(index, fcntl.LOCK_EX)
+                try:
+                    # Rows are positions in the files, which other processes may have grown
+                    vectors_file = self.path / "vectors.f32"
+                    first = self._file_rows()
+                    index_rows = index.seek(0, 2) // DIGEST_SIZE
+                    if index_rows != first:
+                        # A writer died between the two appends: drop the unpaired rows
+                        first = min(first, index_rows)
+                        index.truncate(first * DIGEST_SIZE)
+                        with open(vectors_file, "ab") as f:
+                            f.truncate(first * self._dim * 4)
+                    with open(vectors_file, "ab") as f:
+                        f.write(matrix[new].tobytes())
+                    index.write(b"".join(digests[i] for i in new))
+                finally:
+                    fcntl.flock(index, fcntl.LOCK_UN)
+            for offset, i in enumerate(new):
+                self._rows[digests[i]] = first + offset
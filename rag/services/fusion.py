@@ -0,0 +1,70 @@
+from typing import Dict, List, Literal, Sequence, Tuple
+
+import numpy as np
+
+FusionMethod = Literal["rrf", "minmax", "zscore"]
+
+# Same constant as LangChain's EnsembleRetriever
+DEFAULT_RRF_K = 60
+
+
+def _normalize(scores: np.ndarray, method: FusionMethod) -> np.ndarray:
+    if scores.size == 0:
+        return scores
+    if method == "minmax":
+        low, high = scores.min(), scores.max()
+        if high - low <= 0:
+            return np.ones_like(scores)
+        return (scores - low) / (high - low)
+    if method == "zscore":
+        std = scores.std()
+        if std <= 0:
+            return np.zeros_like(scores)
+        return (scores - scores.mean()) / std
+    raise ValueError(f"Unsupported normalization: {method}")
+
+
+def fuse(
+    ranked_lists: Sequence[Tuple[Sequence[str], Sequence[float]]],
+    weights: Sequence[float],
+    *,
+    method: FusionMethod = "rrf",
+    rrf_k: int = DEFAULT_RRF_K,
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Fuse several retrievers' results given as (ids best first, scores higher-is-better).
+
+    - "rrf": weighted reciprocal rank fusion, sum(w / (rrf_k + rank)), ranks start at 1.
+    - "minmax" / "zscore": weighted sum of per-list normalized scores. A document missing
+      from a list gets that list's lowest normalized score.
+
+    Ids are deduplicated before anything is materialized. Returns (ids, fused scores) sorted
+    by fused score, best first.
+    """
+    if len(ranked_lists) != len(weights):
+        raise ValueError("ranked_lists and weights must have the same length")
+
+    positions: Dict[str, int] = {}
+    for ids, _ in ranked_lists:
+        for doc_id in ids:
+            positions.setdefault(doc_id, len(positions))
+    fused_ids = list(positions)
+    fused = np.zeros(len(fused_ids), dtype=np.float64)
+    if not fused_ids:
+        return [], fused
+
+    for (ids, scores), weight in zip(ranked_lists, weights):
+        if not ids or weight == 0:
+            continue
+        rows = np.fromiter((positions[d] for d in ids), dtype=np.int64, count=len(ids))
+        if method == "rrf":
+            ranks = np.arange(1, len(ids) + 1, dtype=np.float64)
+            np.add.at(fused, rows, weight / (rrf_k + ranks))
+        else:
+            normalized = _normalize(np.asarray(scores, dtype=np.float64), method)
+            contribution = np.full(len(fused_ids), normalized.min() * weight)
+            contribution[rows] = normalized * weight
+            fused += contribution
+
+    order = np.argsort(-fused, kind="stable")
+    return [fused_ids[i] for i in order], fused[order]
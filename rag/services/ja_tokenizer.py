@@ -0,0 +1,191 @@
+"""
+Japanese tokenization for BM25.
+
+Two tokenizers are available:
+- "sudachi": Sudachi morphemes (split mode C), without symbols and stopwords.
+- "ngram": character n-grams (bigrams and trigrams by default) of Japanese text runs, whole
+  words for ASCII runs. No dictionary, much faster, and used as the fallback when Sudachi
+  cannot be loaded.
+
+Queries are tokenized in the calling thread (Sudachi tokenizers are thread-local, so
+concurrent hybrid requests do not share one tokenizer object). Corpus tokenization during
+index builds can run on a process pool whose workers each load their own dictionary.
+"""
+
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import jaconv
+from core.logging import logger
+
+CUR_DIR = Path(__file__).parent
+JA_STOPWORDS = set()
+with open(CUR_DIR / "stopwords-ja.txt", "r", encoding="utf-8") as f:
+    for line in f:
+        JA_STOPWORDS.add(line.strip())
+
+_local = threading.local()
+
+
+def _tokenizer():
+    tok = getattr(_local, "tok", None)
+    if tok is None:
+        # Imported on first use: not needed at all with n-gram tokens
+        from sudachipy import dictionary, tokenizer
+
+        tok = _local.tok = dictionary.Dictionary().create(
+            mode=tokenizer.Tokenizer.SplitMode.C
+        )
+    return tok
+
+
+DEFAULT_NGRAM_SIZES: Tuple[int, ...] = (2, 3)
+# ASCII words (after z2h) are kept whole; runs of other word characters are split into
+# n-grams. Whitespace, symbols and punctuation separate runs and are dropped.
+_RUN = re.compile(r"[a-z0-9]+|[^\W_a-z0-9]+")
+_ASCII_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    text = jaconv.z2h(text, kana=False, digit=True, ascii=True)
+    text = text.replace("\n", "").replace("\r", "")
+    return text.lower()
+
+
+def ngram_preprocess(
+    text: str, sizes: Sequence[int] = DEFAULT_NGRAM_SIZES
+) -> List[str]:
+    """
+    Character n-grams of each non-ASCII run (a run shorter than the smallest size is kept
+    as is), whole ASCII words, without stopwords.
+    """
+    t = _normalize(text)
+    shortest = min(sizes)
+    results: List[str] = []
+    for run in _RUN.findall(t):
+        if len(run) <= shortest or _ASCII_WORD.fullmatch(run):
+            grams = [run]
+        else:
+            grams = [
+                run[i : i + n] for n in sizes for i in range(len(run) - n + 1)
+            ]
+        results.extend(g for g in grams if g not in JA_STOPWORDS)
+    return results
+
+
+def ja_preprocess(text: str) -> List[str]:
+    t = _normalize(text)
+
+    try:
+        tok = _tokenizer()
+    except Exception as e:
+        logger.warning(f"Sudachi tokenizer unavailable, fallback to n-grams: {e}")
+        return ngram_preprocess(text)
+
+    results = [
+        m.surface()
+        for m in tok.tokenize(t)
+        if m.part_of_speech()[0] != "補助記号" and m.surface() not in JA_STOPWORDS
+    ]
+
+    return results
+
+
+TokenizeFn = Callable[[str], List[str]]
+
+
+def resolve_tokenizer(
+    name: str, ngram_sizes: Sequence[int] = DEFAULT_NGRAM_SIZES
+) -> Tuple[str, TokenizeFn]:
+    """
+    (tokenizer id, tokenize function) for a configured tokenizer name. The id identifies
+    the token stream (e.g. in BM25 snapshots). "sudachi" resolves to the n-gram tokenizer
+    when the dictionary cannot be loaded.
+    """
+    sizes = tuple(sorted(set(int(n) for n in ngram_sizes)))
+    if not sizes or sizes[0] < 1:
+        raise ValueError(f"Invalid n-gram sizes: {ngram_sizes}")
+    ngram = (f"ngram-{','.join(map(str, sizes))}", partial(ngram_preprocess, sizes=sizes))
+    if name == "ngram":
+        return ngram
+    if name == "sudachi":
+        try:
+            _tokenizer()
+        except Exception as e:
+            logger.warning(f"[RAG] Sudachi unavailable, BM25 uses {ngram[0]} tokens: {e}")
+            return ngram
+        return "sudachi-C", ja_preprocess
+    raise ValueError(f"Unknown BM25 tokenizer: {name}")
+
+
+def _tokenize_chunk(tokenize: TokenizeFn, texts: Sequence[str]) -> List[List[str]]:
+    return [tokenize(text or "") for text in texts]
+
+
+class CorpusTokenizer:
+    """
+    Tokenizes document batches with `tokenize` on a lazily started pool of `workers`
+    processes, `chunk_size` documents per task. Spawned (not forked) workers: the parent
+    runs threads and holds Torch/Chroma state that must not be copied. Small batches,
+    `workers <= 1`, or a broken pool fall back to tokenizing in the calling thread.
+    `tokenize` must be picklable (a module-level function or a partial of one).
+    """
+
+    def __init__(self, tokenize: TokenizeFn, workers: int, chunk_size: int):
+        self._tokenize = tokenize
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                logger.info(f"[RAG] Starting {self.workers} tokenizer worker processes")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def tokenize(self, texts: Sequence[str]) -> List[List[str]]:
+        """Token lists of `texts`, in order."""
+        if self.workers <= 1 or len(texts) <= self.chunk_size:
+            return _tokenize_chunk(self._tokenize, texts)
+        chunks = [
+            texts[i : i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)
+        ]
+        try:
+            results = self._get_pool().map(partial(_tokenize_chunk, self._tokenize), chunks)
+            return [tokens for chunk in results for tokens in chunk]
+        except BrokenProcessPool as e:
+            logger.warning(f"[RAG] Tokenizer pool failed, tokenizing in-process: {e}")
+            self.shutdown()
+            return _tokenize_chunk(self._tokenize, texts)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def default_workers() -> int:
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+__all__ = [
+    "ja_preprocess",
+    "ngram_preprocess",
+    "resolve_tokenizer",
+    "CorpusTokenizer",
+    "JA_STOPWORDS",
+    "default_workers",
+]
@@ -0,0 +1,54 @@
+"""
+Local model weights in safetensors format.
+
+transformers prefers `model.safetensors` over `pytorch_model.bin` when both are present.
+safetensors files are memory-mapped on load instead of unpickled and copied, so a model
+directory that only has the pickle is converted once, next to it.
+"""
+
+import os
+from pathlib import Path
+
+from config.index import config
+from core.logging import logger
+
+# Convert pickled local weights to safetensors once (memory-mapped loading)
+CONVERT_TO_SAFETENSORS: bool = getattr(config.Models, "convertToSafetensors", True)
+SAFETENSORS_WEIGHTS = "model.safetensors"
+PICKLE_WEIGHTS = "pytorch_model.bin"
+
+
+def ensure_safetensors(model_dir: str | Path) -> bool:
+    """
+    Make sure `model_dir` has safetensors weights, converting `pytorch_model.bin` if needed.
+    Returns False when there are none (sharded or missing pickle, or conversion failed);
+    the model then loads from the pickle as before.
+    """
+    model_dir = Path(model_dir)
+    target = model_dir / SAFETENSORS_WEIGHTS
+    if target.exists():
+        return True
+    source = model_dir / PICKLE_WEIGHTS
+    if not source.exists():
+        return False
+
+    try:
+        import torch
+        from safetensors.torch import save_file
+
+        state = torch.load(source, map_location="cpu", weights_only=True)
+        # safetensors rejects tensors sharing memory (tied weights): store a copy of each
+        # alias, transformers ties them again on load
+        tensors, seen = {}, set()
+        for name, tensor in state.items():
+            storage = tensor.untyped_storage().data_ptr()
+            tensors[name] = (tensor.clone() if storage in seen else tensor).contiguous()
+            seen.add(storage)
+        tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        save_file(tensors, str(tmp), metadata={"format": "pt"})
+        os.replace(tmp, target)
+    except Exception as e:
+        logger.warning(f"[RAG] Could not convert {source} to safetensors: {e}")
+        return False
+    logger.info(f"[RAG] Converted {source} to {target}")
+    return True
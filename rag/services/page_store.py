@@ -0,0 +1,176 @@
+import zlib
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+from chromadb.base_types import Metadata
+from config.index import config
+from core.logging import logger
+from repositories.chroma_repository import ChromaRepository, chroma_db
+from utils.search import ChromaDBSearchResultItem, parse_query_result
+
+# Collection metadata flag that marks a collection as a page store shard, so that
+# metadata scans (delete by name, migration) never mistake it for a per-page collection.
+PAGE_STORE_SHARD_KEY = "page_store_shard"
+
+
+class PageStore:
+    """
+    splitByPage chunks of all pages stored in one (or a few sharded) Chroma collections.
+
+    Each chunk keeps its page id (`page_id`), its position in the page (`chunk_index_i`)
+    and the logical collection name it was uploaded under (`name`) in its metadata, so a
+    search over many pages is a single filtered ANN call per shard instead of one query
+    per page collection.
+    """
+
+    def __init__(
+        self,
+        repository: ChromaRepository,
+        *,
+        enabled: bool = False,
+        collection_name: str = "splitByPagePageStore",
+        shards: int = 1,
+        legacy_fallback: bool = True,
+    ):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.repository = repository
+        self.enabled = enabled
+        self.collection_name = collection_name
+        self.shards = shards
+        self.legacy_fallback = legacy_fallback
+
+    def shard_name(self, page_id: str) -> str:
+        if self.shards == 1:
+            return self.collection_name
+        shard = zlib.crc32(page_id.encode("utf-8")) % self.shards
+        return f"{self.collection_name}-{shard}"
+
+    def shard_names(self) -> List[str]:
+        if self.shards == 1:
+            return [self.collection_name]
+        return [f"{self.collection_name}-{i}" for i in range(self.shards)]
+
+    def is_shard(self, collection_name: str) -> bool:
+        return collection_name in self.shard_names()
+
+    def _shard_collection(self, shard_name: str):
+        return self.repository.get_or_create_collection(
+            name=shard_name, metadata={PAGE_STORE_SHARD_KEY: shard_name}
+        )
+
+    @staticmethod
+    def chunk_ids(page_id: str, n: int) -> List[str]:
+        """Ids of the chunks of `page_id`; stable, so re-uploading a page overwrites them."""
+        return [f"{page_id}::{i}" for i in range(n)]
+
+    def add_page_chunks(
+        self,
+        *,
+        page_id: str,
+        collection_name: str,
+        documents: Sequence[str],
+        embeddings: np.ndarray,
+        metadatas: Sequence[Metadata],
+    ) -> int:
+        """Replace all chunks of `page_id` with the given ones. Returns the number of chunks written."""
+        collection = self._shard_collection(self.shard_name(page_id))
+        # Re-uploading a page must not leave chunks of its previous version behind
+        collection.delete(where={"page_id": page_id})
+        if not documents:
+            return 0
+
+        ids = self.chunk_ids(page_id, len(documents))
+        page_metadatas: List[Metadata] = [
+            {**meta, "page_id": page_id, "chunk_index_i": i, "name": collection_name}
+            for i, meta in enumerate(metadatas)
+        ]
+        collection.add(
+            ids=ids,
+            documents=list(documents),
+            embeddings=embeddings,
+            metadatas=page_metadatas,
+        )
+        return len(ids)
+
+    def query(
+        self,
+        page_ids: Sequence[str],
+        query_vector: Sequence[float],
+        top_k_per_page: int,
+    ) -> List[ChromaDBSearchResultItem]:
+        """
+        Search the chunks of `page_ids` with one ANN call per shard. The result size matches
+        what querying each page collection with `top_k_per_page` would have returned at most.
+        """
+        results: List[ChromaDBSearchResultItem] = []
+        for collection, shard_page_ids in self._shards_of(page_ids):
+            raw = collection.query(
+                query_embeddings=[query_vector],  # type: ignore
+                n_results=max(1, top_k_per_page * len(shard_page_ids)),
+                where=self._page_filter(shard_page_ids),  # type: ignore
+                include=["documents", "metadatas", "distances"],
+            )
+            results.extend(parse_query_result(raw) or [])
+        return results
+
+    def stored_page_ids(self, page_ids: Sequence[str]) -> Set[str]:
+        """
+        Those of `page_ids` that have chunks in the store, from metadata (one `get` per
+        shard, no ANN): pages without a hit in a query's results are stored all the same.
+        """
+        stored: Set[str] = set()
+        for collection, shard_page_ids in self._shards_of(page_ids):
+            where = self._page_filter(shard_page_ids)
+            ids = collection.get(where=where, include=[])["ids"]  # type: ignore
+            stored.update(chunk_id.rsplit("::", 1)[0] for chunk_id in ids)
+        return stored
+
+    def _shards_of(self, page_ids: Sequence[str]):
+        """(shard collection, its page ids) for each existing shard of `page_ids`."""
+        by_shard: Dict[str, List[str]] = {}
+        for page_id in page_ids:
+            by_shard.setdefault(self.shard_name(page_id), []).append(page_id)
+        for shard_name, shard_page_ids in by_shard.items():
+            try:
+                collection = self.repository.get_collection(shard_name)
+            except Exception:
+                logger.debug(f"[RAG] Page store shard '{shard_name}' does not exist yet")
+                continue
+            yield collection, shard_page_ids
+
+    @staticmethod
+    def _page_filter(page_ids: List[str]) -> dict:
+        if len(page_ids) == 1:
+            return {"page_id": page_ids[0]}
+        return {"page_id": {"$in": page_ids}}
+
+    def delete_by_name(self, collection_name: str) -> int:
+        """Delete every chunk uploaded under the logical `collection_name`. Returns the number deleted."""
+        deleted = 0
+        for shard_name in self.shard_names():
+            try:
+                collection = self.repository.get_collection(shard_name)
+            except Exception:
+                continue
+            ids = collection.get(where={"name": collection_name}, include=[])["ids"]
+            if ids:
+                collection.delete(ids=ids)
+                deleted += len(ids)
+        return deleted
+
+
+def _load_page_store(repository: ChromaRepository) -> PageStore:
+    settings = getattr(config.RAG.PreProcess.PDF.splitByPage, "pageStore", None)
+    if settings is None:
+        return PageStore(repository)
+    return PageStore(
+        repository,
+        enabled=getattr(settings, "enabled", False),
+        collection_name=getattr(settings, "collectionName", "splitByPagePageStore"),
+        shards=getattr(settings, "shards", 1),
+        legacy_fallback=getattr(settings, "legacyFallback", True),
+    )
+
+
+page_store = _load_page_store(chroma_db)
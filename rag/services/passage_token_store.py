@@ -0,0 +1,104 @@
+"""
+Side store of reranker token ids per chunk, written at ingest so that reranking does not
+re-tokenize passages:
+
+    <RAG.VectorStore.path>/rerank_tokens.sqlite3
+
+Rows are keyed by (chunk id, tokenizer/model name, max length) and carry a hash of the text
+they were computed from: a lookup only returns token ids whose text still matches, so an
+outdated row (re-uploaded chunk, changed model or rerankMaxLength) is simply a miss.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+from config.index import config
+
+STORE_PATH = Path(config.RAG.VectorStore.path) / "rerank_tokens.sqlite3"
+# Stay below SQLite's host parameter limit
+_QUERY_CHUNK = 500
+
+
+def content_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class PassageTokenStore:
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS passage_tokens ("
+                " chunk_id TEXT NOT NULL, model TEXT NOT NULL, max_length INTEGER NOT NULL,"
+                " content_hash BLOB NOT NULL, token_ids BLOB NOT NULL,"
+                " PRIMARY KEY (chunk_id, model, max_length))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def put_many(
+        self,
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+        token_ids: Sequence[Sequence[int]],
+        *,
+        model: str,
+        max_length: int,
+    ) -> None:
+        rows = [
+            (
+                chunk_id,
+                model,
+                max_length,
+                content_hash(text),
+                np.asarray(ids, dtype=np.int32).tobytes(),
+            )
+            for chunk_id, text, ids in zip(chunk_ids, texts, token_ids)
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO passage_tokens VALUES (?, ?, ?, ?, ?)", rows
+                )
+
+    def get_many(
+        self,
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+        *,
+        model: str,
+        max_length: int,
+    ) -> Dict[str, List[int]]:
+        """Token ids of the chunks whose stored text hash matches `texts`."""
+        expected = {chunk_id: content_hash(text) for chunk_id, text in zip(chunk_ids, texts)}
+        found: Dict[str, List[int]] = {}
+        ids = list(expected)
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(ids), _QUERY_CHUNK):
+                chunk = ids[i : i + _QUERY_CHUNK]
+                rows = conn.execute(
+                    "SELECT chunk_id, content_hash, token_ids FROM passage_tokens"
+                    " WHERE model = ? AND max_length = ?"
+                    f" AND chunk_id IN ({','.join('?' * len(chunk))})",
+                    (model, max_length, *chunk),
+                ).fetchall()
+                for chunk_id, digest, blob in rows:
+                    if expected.get(chunk_id) == digest:
+                        found[chunk_id] = np.frombuffer(blob, dtype=np.int32).tolist()
+        return found
+
+
+passage_token_store = PassageTokenStore(STORE_PATH)
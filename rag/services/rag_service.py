@@ -1,20 +1,43 @@
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Optional
 
 from config.index import config
 from core.logging import logger
+from core.metrics import metrics
 from models.schemas import SearchRequest
-from repositories.chroma_repository import chroma_db
+from repositories.chroma_repository import COLLECTION_NOT_FOUND, chroma_db
+from services.page_store import page_store
 from services.reranker_service import get_ranked_results
-from utils.search import search_query
+from utils.search import embed_search_query, search_query
 
+SEARCH_MAX_WORKERS: int = getattr(config.RAG.Retrieval, "searchMaxWorkers", 8)
+SEARCH_COLLECTION_TIMEOUT: float = getattr(
+    config.RAG.Retrieval, "searchCollectionTimeout", 5.0
+)
 
-def search_process(collection_name, query):
+# Shared by all requests so that the total number of concurrent Chroma queries stays bounded
+_search_executor = ThreadPoolExecutor(
+    max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="rag-search"
+)
+
+_fanout_width = metrics.summary("rag.search.fanout_width")
+_collection_latency = metrics.summary("rag.search.collection_latency_ms")
+_page_store_latency = metrics.summary("rag.search.page_store_latency_ms")
+_collection_timeouts = metrics.counter("rag.search.collection_timeouts")
+_collection_errors = metrics.counter("rag.search.collection_errors")
+
+
+def search_process(collection_name, query_vector):
+    started = time.perf_counter()
     try:
-        # Step 1: Query ChromaDB
+        # Step 1: Query ChromaDB with the query vector shared by the whole request
         collection = chroma_db.get_collection(collection_name)
         raw_result = search_query(
-            collection, query, top_k=config.RAG.Retrieval.topKForEachCollection
+            collection,
+            query_vector=query_vector,
+            top_k=config.RAG.Retrieval.topKForEachCollection,
         )
 
         if not raw_result:
@@ -24,12 +47,73 @@ def search_process(collection_name, query):
             logger.info(f"[RAG] Raw search results: {raw_result}")
 
         return raw_result
-    except Exception as _:
-        if config.APP_MODE == "rag-evaluation":
-            logger.error(
-                f"[RAG] Error in search_process('{collection_name}'), skipping..."
-            )
-            return []
+    finally:
+        _collection_latency.observe((time.perf_counter() - started) * 1000)
+
+
+def _fan_out(collection_names, query_vector) -> list:
+    """
+    Run `search_process` for every collection on the shared executor.
+
+    Each collection gets `SEARCH_COLLECTION_TIMEOUT` seconds from the moment a worker starts
+    it, so time spent queued behind other requests does not count. Collections that run past
+    their timeout or fail are skipped (and counted); collections that do not exist, such as
+    a neighbor chunk past the last one, are skipped silently. Results keep the collection
+    order.
+    """
+    names = sorted(collection_names)
+    _fanout_width.observe(len(names))
+    if not names:
+        return []
+
+    # Start time of each collection, stamped by the worker that runs it
+    started_at: List[Optional[float]] = [None] * len(names)
+
+    def run(i: int, name: str):
+        started_at[i] = time.monotonic()
+        return search_process(name, query_vector)
+
+    futures = {
+        _search_executor.submit(run, i, name): i for i, name in enumerate(names)
+    }
+    pending = set(futures)
+    results: List[list] = [[] for _ in names]
+    while pending:
+        # Wake up at the earliest deadline of a running collection. Collections still
+        # queued get a full timeout: any that starts meanwhile has a later deadline.
+        now = time.monotonic()
+        deadlines = [
+            started_at[futures[f]] + SEARCH_COLLECTION_TIMEOUT  # type: ignore[operator]
+            for f in pending
+            if started_at[futures[f]] is not None
+        ]
+        timeout = max(0.0, min(deadlines) - now) if deadlines else SEARCH_COLLECTION_TIMEOUT
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = futures[future]
+            try:
+                results[i] = future.result() or []
+            except COLLECTION_NOT_FOUND:
+                logger.debug(f"[RAG] Collection '{names[i]}' does not exist, skipping")
+            except Exception as e:
+                _collection_errors.inc()
+                logger.error(
+                    f"[RAG] Error searching collection '{names[i]}': {e}", exc_info=True
+                )
+
+        now = time.monotonic()
+        for future in list(pending):
+            i = futures[future]
+            stamp = started_at[i]
+            if stamp is not None and now - stamp >= SEARCH_COLLECTION_TIMEOUT:
+                # A running Chroma query cannot be cancelled: leave it, drop its result
+                pending.discard(future)
+                _collection_timeouts.inc()
+                logger.warning(
+                    f"[RAG] Collection '{names[i]}' timed out after "
+                    f"{SEARCH_COLLECTION_TIMEOUT}s, skipping"
+                )
+    return [item for result in results for item in result]
 
 
 def search_rag(req: SearchRequest):
@@ -62,22 +146,32 @@ def search_rag(req: SearchRequest):
         else:
             expanded_collection_name_set = set(req.collection_name)
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future_to_name = {
-                executor.submit(search_process, name, req.query): name
-                for name in expanded_collection_name_set
-            }
-            for future in as_completed(future_to_name):
-                collection_name = future_to_name[future]
-                try:
-                    result = future.result()
-                    if result:
-                        all_results.extend(result)
-                except Exception as e:
-                    logger.error(
-                        f"[RAG] Error in thread for collection '{collection_name}': {e}",
-                        exc_info=True,
-                    )
+        # Embed the query once; every collection (including neighbor chunks) reuses it
+        query_vector = embed_search_query(req.query)
+
+        legacy_collection_names = expanded_collection_name_set
+        if page_store.enabled:
+            page_store_started = time.perf_counter()
+            page_results = page_store.query(
+                list(expanded_collection_name_set),
+                query_vector,
+                top_k_per_page=config.RAG.Retrieval.topKForEachCollection,
+            )
+            _page_store_latency.observe(
+                (time.perf_counter() - page_store_started) * 1000
+            )
+            all_results.extend(page_results)
+            # Pages ingested before the page store existed still live in their own collection
+            # until they are migrated (scripts/migrate_page_store.py). Whether a page is in
+            # the store comes from its metadata, not from this query's hits.
+            legacy_collection_names = (
+                expanded_collection_name_set
+                - page_store.stored_page_ids(list(expanded_collection_name_set))
+                if page_store.legacy_fallback
+                else set()
+            )
+
+        all_results.extend(_fan_out(legacy_collection_names, query_vector))
 
         # Step 3: Rerank top N
         if not all_results:
@@ -1,11 +1,14 @@
+from langchain_core.documents import Document
 from models.schemas import DeleteRequest, UpdateRequest
 from repositories.chroma_repository import chroma_db
 from services.embedder import embed_text, process_text
+from services.HybridRAGEngineFactory import hybrid_RAG_engine_factory
 
 
 def delete_document(req: DeleteRequest):
     collection = chroma_db.get_collection(name=req.collection_name)
     collection.delete(ids=req.ids)
+    hybrid_RAG_engine_factory.on_ids_deleted(req.collection_name, req.ids)
     return {"status": "record deleted", "ids": req.ids}
 
 def update_document(req: UpdateRequest):
@@ -20,6 +23,10 @@ def update_document(req: UpdateRequest):
         documents=[clean_text],
         embeddings=[embedding]
     )
+    # 同じIDで追加するとBM25インデックス上の旧トークンは置き換えられる
+    hybrid_RAG_engine_factory.on_documents_added(
+        req.collection_name, [Document(id=req.id, page_content=clean_text, metadata={})]
+    )
 
     return {
         "status": "updated",
@@ -0,0 +1,152 @@
+"""
+Startup calibration of the reranker: score synthetic (query, passage) requests over a grid of
+batch sizes and intra-op thread counts and keep the fastest setting. Results are stored in
+one JSON file, keyed by host, CPU count, model, backend, device and max length, so later
+starts on the same machine reuse them instead of calibrating again:
+
+    <RAG.VectorStore.path>/rerank_autotune.json
+
+Delete the file (or the host's entry) to calibrate again.
+"""
+
+import json
+import os
+import random
+import socket
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from core.logging import logger
+
+# Scores one request: (query, passages, batch size)
+ScoreFn = Callable[[str, List[str], int], object]
+
+_QUERIES = ["有給休暇はいつから取得できますか", "出張旅費の精算期限", "在宅勤務の申請方法"]
+_FILLER = "従業員は会社の定める手続きに従い、所属長の承認を得なければならない。"
+# Passage lengths in characters: mostly single articles, some long ones that get truncated
+DEFAULT_PASSAGE_CHARS = (80, 150, 300, 300, 600, 1200)
+
+
+@dataclass
+class TunedSettings:
+    key: str
+    batch_size: int
+    # None: the backend's own thread pool was left alone (CUDA, onnxruntime)
+    threads: Optional[int]
+    pairs_per_second: float
+    tuned_at: float = field(default_factory=time.time)
+    # "<threads>x<batch size>" -> pairs per second, for every point of the grid
+    measurements: Dict[str, float] = field(default_factory=dict)
+
+
+def settings_key(model: str, backend: str, device: str, max_length: int) -> str:
+    return "|".join(
+        [
+            socket.gethostname(),
+            f"cpus={os.cpu_count()}",
+            model,
+            backend,
+            device,
+            f"max_length={max_length}",
+        ]
+    )
+
+
+def default_thread_counts() -> List[int]:
+    cpus = os.cpu_count() or 1
+    return sorted({max(1, cpus // 4), max(1, cpus // 2), cpus})
+
+
+def load_settings(path: Path, key: str) -> Optional[TunedSettings]:
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8")).get(key)
+        return TunedSettings(**entry) if entry else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"[RAG] Ignoring unreadable reranker autotune file {path}: {e}")
+        return None
+
+
+def save_settings(path: Path, settings: TunedSettings) -> None:
+    """Add or replace this key's entry; entries of other hosts/models are kept."""
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        entries = {}
+    entries[settings.key] = asdict(settings)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    tmp.write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def synthetic_requests(
+    n_requests: int,
+    pairs_per_request: int,
+    passage_chars: Sequence[int] = DEFAULT_PASSAGE_CHARS,
+    seed: int = 0,
+) -> List[tuple]:
+    """(query, passages) requests whose passage lengths follow `passage_chars`."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(n_requests):
+        passages = []
+        for _ in range(pairs_per_request):
+            n_chars = rng.choice(passage_chars)
+            passages.append((_FILLER * (n_chars // len(_FILLER) + 1))[:n_chars])
+        requests.append((rng.choice(_QUERIES), passages))
+    return requests
+
+
+def calibrate(
+    score: ScoreFn,
+    *,
+    key: str,
+    batch_sizes: Sequence[int],
+    thread_counts: Sequence[Optional[int]],
+    requests: Sequence[tuple],
+    repeat: int = 2,
+) -> TunedSettings:
+    """
+    Time `score` over `requests` for every (threads, batch size) of the grid and return the
+    setting with the highest throughput. A None thread count leaves torch's setting as is.
+    """
+    n_pairs = sum(len(passages) for _, passages in requests)
+    best: Optional[TunedSettings] = None
+    measurements: Dict[str, float] = {}
+    for threads in thread_counts:
+        if threads:
+            import torch
+
+            torch.set_num_threads(int(threads))
+        query, passages = requests[0]
+        score(query, passages, max(batch_sizes))  # warm-up
+        for batch_size in batch_sizes:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for query, passages in requests:
+                    score(query, passages, batch_size)
+                samples.append(time.perf_counter() - started)
+            throughput = n_pairs / statistics.median(samples)
+            measurements[f"{threads or 'default'}x{batch_size}"] = round(throughput, 2)
+            logger.info(
+                f"[RAG] Reranker autotune: threads={threads or 'default'} "
+                f"batch_size={batch_size} -> {throughput:.1f} pairs/s"
+            )
+            if best is None or throughput > best.pairs_per_second:
+                best = TunedSettings(
+                    key=key,
+                    batch_size=int(batch_size),
+                    threads=int(threads) if threads else None,
+                    pairs_per_second=round(throughput, 2),
+                )
+    if best is None:
+        raise ValueError("Empty autotune grid")
+    best.measurements = measurements
+    return best
+
@@ -0,0 +1,53 @@
+"""
+Cheap first stage for reranking: prune the candidate list with the cosine similarity of the
+stored passage embeddings, so only the ambiguous head goes to the cross-encoder.
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def cosine_scores(
+    query_vector: Sequence[float], vectors: Sequence[Optional[Sequence[float]]]
+) -> np.ndarray:
+    """Cosine similarity of each vector to the query; NaN where a vector is missing."""
+    scores = np.full(len(vectors), np.nan, dtype=np.float32)
+    rows = [i for i, v in enumerate(vectors) if v is not None and len(v)]
+    if not rows:
+        return scores
+    query = np.asarray(query_vector, dtype=np.float32)
+    matrix = np.asarray([vectors[i] for i in rows], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+    norms[norms == 0] = 1.0
+    scores[rows] = matrix @ query / norms
+    return scores
+
+
+def select_for_rerank(
+    scores: np.ndarray, top_k: int, *, margin: float, max_candidates: int = 0
+) -> List[int]:
+    """
+    Positions of the candidates worth a cross-encoder pass, best first-stage score first.
+
+    A candidate is kept when its first-stage score is within `margin` of the top_k-th best
+    one: anything further below cannot plausibly enter the top_k. Candidates without a score
+    (NaN) are kept after the scored ones. At least top_k and at most
+    max(max_candidates, top_k) candidates are returned (0 = no cap).
+    """
+    n = len(scores)
+    if n <= top_k:
+        return list(range(n))
+    order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind="stable")
+    scored = [int(i) for i in order if not np.isnan(scores[i])]
+    unscored = [i for i in range(n) if np.isnan(scores[i])]
+
+    kept = []
+    if scored:
+        # With fewer than top_k scored candidates, the cutoff is the lowest score (keep all)
+        cutoff = scores[scored[min(top_k, len(scored)) - 1]] - margin
+        kept = [i for i in scored if scores[i] >= cutoff]
+    kept += unscored
+    if max_candidates > 0:
+        kept = kept[: max(max_candidates, top_k)]
+    return kept
@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Sequence, Tuple
+
+from core.logging import logger
+from core.metrics import metrics
+
+# (query, passage, ...) items; anything after the passage is passed through to `predict`
+Pair = Tuple[Any, ...]
+
+
+@dataclass
+class _Request:
+    pairs: List[Pair]
+    future: Future
+    enqueued: float = field(default_factory=time.perf_counter)
+
+
+class RerankScheduler:
+    """
+    Dynamic micro-batching of (query, passage) pairs across concurrent requests.
+
+    Callers submit their pairs and wait on a future. One worker thread takes the oldest
+    request, keeps collecting queued requests until `max_batch_pairs` pairs are gathered or
+    `max_wait_ms` has passed since it took the first one, scores all of them in a single
+    `predict` call and routes each slice of scores back to its caller. A request larger
+    than `max_batch_pairs` is never split across scheduler batches (`predict` batches it).
+    """
+
+    def __init__(
+        self,
+        predict: Callable[[List[Pair]], Sequence[float]],
+        *,
+        max_batch_pairs: int,
+        max_wait_ms: float,
+        name: str = "rerank",
+    ):
+        self._predict = predict
+        self.max_batch_pairs = max(1, max_batch_pairs)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._name = name
+        self._batch_pairs = metrics.summary(f"rag.{name}.batch_pairs")
+        self._batch_requests = metrics.summary(f"rag.{name}.batch_requests")
+        self._queue_wait = metrics.summary(f"rag.{name}.queue_wait_ms")
+
+    def submit(self, pairs: Sequence[Pair]) -> Future:
+        """Future resolving to the scores of `pairs`, in order."""
+        request = _Request(pairs=list(pairs), future=Future())
+        if not request.pairs:
+            request.future.set_result([])
+            return request.future
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def score(self, pairs: Sequence[Pair]) -> List[float]:
+        return self.submit(pairs).result()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"{self._name}-scheduler", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        n_pairs = len(batch[0].pairs)
+        deadline = time.perf_counter() + self.max_wait
+        while n_pairs < self.max_batch_pairs:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_pairs += len(request.pairs)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            for request in batch:
+                self._queue_wait.observe((started - request.enqueued) * 1000)
+            pairs = [pair for request in batch for pair in request.pairs]
+            self._batch_pairs.observe(len(pairs))
+            self._batch_requests.observe(len(batch))
+            try:
+                scores = list(self._predict(pairs))
+                if len(scores) != len(pairs):
+                    raise RuntimeError(
+                        f"predict returned {len(scores)} scores for {len(pairs)} pairs"
+                    )
+            except BaseException as e:
+                logger.error(f"[RAG] Batched {self._name} failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            offset = 0
+            for request in batch:
+                request.future.set_result(scores[offset : offset + len(request.pairs)])
+                offset += len(request.pairs)
@@ -1,14 +1,37 @@
+from __future__ import annotations
+
+import hashlib
 import os
-from typing import List, Optional, Sequence
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
 
-import torch
 from config.index import config
 from langchain_core.documents import Document
+from core.cache import LRUCache
 from core.logging import logger
-from torch import Tensor
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from core.metrics import metrics
+from core.readiness import readiness
+from services.batching import length_buckets
+from services.model_files import CONVERT_TO_SAFETENSORS, ensure_safetensors
+from services.passage_token_store import passage_token_store
+from services.rerank_autotune import (
+    TunedSettings,
+    calibrate,
+    default_thread_counts,
+    load_settings,
+    save_settings,
+    settings_key,
+    synthetic_requests,
+)
+from services.rerank_scheduler import RerankScheduler
 from utils.search import ChromaDBSearchResultItem
 
+if TYPE_CHECKING:
+    from torch import Tensor
+
 os.environ["TRANSFORMERS_VERBOSITY"] = "error"
 
 # ---------------------------
@@ -26,21 +49,79 @@ DEFAULT_BSZ_CUDA: int = config.RAG.Retrieval.rerankBatchSize
 DEFAULT_BSZ_CPU: int = config.RAG.Retrieval.rerankBatchSizeCPU
 USE_COMPILE: bool = config.RAG.Retrieval.rerankUseCompile
 USE_8BIT: bool = config.RAG.Retrieval.rerankUse8Bit
-
-device: str = "cuda" if torch.cuda.is_available() else "cpu"
-if config.RAG.Retrieval.throwErrorWhenCUDAUnavailable and device != "cuda":
-    raise RuntimeError(
-        "CUDA is not available, if you want to run on CPU, "
-        "please set throwErrorWhenCUDAUnavailable to false in the config file."
-    )
-
-logger.info(f"Reranker device: {device}")
+# 同時リクエストの(query, passage)ペアをまとめて1回の推論で処理（マイクロバッチング）
+USE_MICRO_BATCHING: bool = getattr(config.RAG.Retrieval, "rerankMicroBatching", True)
+MAX_WAIT_MS: float = getattr(config.RAG.Retrieval, "rerankMaxWaitMs", 5.0)
+# 長さバケット化：1バッチの (ペア数 × 最長トークン長) の上限。None/0 で到着順の固定件数バッチ
+TOKEN_BUDGET: Optional[int] = getattr(config.RAG.Retrieval, "rerankTokenBudget", 8192) or None
+# スコアキャッシュ（LRU + TTL）：(正規化query, passageハッシュ, モデル名, MAX_LENGTH, バックエンド) -> スコア
+USE_SCORE_CACHE: bool = getattr(config.RAG.Retrieval, "rerankCacheEnabled", True)
+SCORE_CACHE_MAX_ENTRIES: int = getattr(config.RAG.Retrieval, "rerankCacheMaxEntries", 50000)
+SCORE_CACHE_TTL_SECONDS: float = getattr(config.RAG.Retrieval, "rerankCacheTTLSeconds", 3600)
+# CPU推論バックエンド："fp32" | "int8"（Linear層の動的int8量子化）| "onnx"（onnxruntime）
+CPU_BACKEND: str = getattr(config.RAG.Retrieval, "rerankCPUBackend", "fp32")
+# CPU推論スレッド数（intra-op）。未指定ならtorch/onnxruntimeの既定値
+CPU_THREADS: Optional[int] = getattr(config.RAG.Retrieval, "rerankCPUThreads", None)
+# 取り込み時にpassageのトークンIDを保存し、rerank時はqueryのみtokenize
+PRETOKENIZE: bool = getattr(config.RAG.Retrieval, "rerankPretokenize", False)
+# ONNXグラフのパス。存在しなければfp32モデルからエクスポートして保存
+ONNX_PATH: Optional[str] = getattr(config.RAG.Retrieval, "rerankOnnxPath", None)
+# 起動時キャリブレーション：batch size × スレッド数のグリッドを計測し、最速の設定をホスト/モデルごとに保存・再利用
+AUTOTUNE: bool = getattr(config.RAG.Retrieval, "rerankAutotune", False)
+AUTOTUNE_BATCH_SIZES: List[int] = list(
+    getattr(config.RAG.Retrieval, "rerankAutotuneBatchSizes", None) or [8, 16, 32, 64]
+)
+# 未指定ならCPUコア数の1/4, 1/2, 全部
+AUTOTUNE_THREADS: List[int] = list(
+    getattr(config.RAG.Retrieval, "rerankAutotuneThreads", None) or default_thread_counts()
+)
+AUTOTUNE_PATH: Path = Path(
+    getattr(config.RAG.Retrieval, "rerankAutotunePath", None)
+    or Path(config.RAG.VectorStore.path) / "rerank_autotune.json"
+)
+
+# torchはモデル読み込み時にimportする（API起動時のimportを軽くする）。deviceは_init_device()で確定
+device: str = "cpu"
+_device_ready = False
+
+_score_cache: LRUCache[float] = LRUCache(SCORE_CACHE_MAX_ENTRIES, SCORE_CACHE_TTL_SECONDS)
+_cache_hits = metrics.counter("rag.rerank.cache_hits")
+_cache_misses = metrics.counter("rag.rerank.cache_misses")
 
 
 # ---------------------------
 # モデル/トークナイザーの読み込み（エラー処理 & 高速化対応）
 # ---------------------------
+def _init_device() -> None:
+    """デバイス検出とCPU推論スレッド数の設定（モデル読み込み時に1回）。"""
+    global device, _active_backend, _device_ready
+    if _device_ready:
+        return
+    import torch
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    if config.RAG.Retrieval.throwErrorWhenCUDAUnavailable and device != "cuda":
+        raise RuntimeError(
+            "CUDA is not available, if you want to run on CPU, "
+            "please set throwErrorWhenCUDAUnavailable to false in the config file."
+        )
+
+    logger.info(f"Reranker device: {device}")
+    if device == "cpu" and CPU_THREADS:
+        torch.set_num_threads(int(CPU_THREADS))
+    _active_backend = "cuda" if device == "cuda" else "fp32"
+    _device_ready = True
+
+
+def _torch_threads() -> Optional[int]:
+    """torchのintra-opスレッド数（未importならNone：メトリクスのためにimportしない）。"""
+    torch = sys.modules.get("torch")
+    return torch.get_num_threads() if torch is not None else None
+
+
 def _preferred_dtype() -> torch.dtype:
+    import torch
+
     if device == "cuda":
         if torch.cuda.is_bf16_supported():
             return torch.bfloat16
@@ -50,6 +131,8 @@ def _preferred_dtype() -> torch.dtype:
 
 _tokenizer = None
 _model = None
+# 実際に使用中のバックエンド（フォールバック後）。スコアキャッシュのキーに含める
+_active_backend: str = "fp32"
 
 
 def _load_tokenizer():
@@ -57,6 +140,8 @@ def _load_tokenizer():
     if _tokenizer is not None:
         return _tokenizer
     logger.info("Loading reranker tokenizer...")
+    from transformers import AutoTokenizer
+
     try:
         _tokenizer = AutoTokenizer.from_pretrained(
             MODEL_NAME,
@@ -74,15 +159,37 @@ def _load_tokenizer():
     return _tokenizer
 
 
-def _load_model():
-    global _model
-    if _model is not None:
-        return _model
+def _local_model_source() -> str:
+    """
+    ローカルキャッシュ上のモデルディレクトリ（重みがpickleのみなら一度safetensorsに変換し、mmapで読み込む）。
+    キャッシュにない/変換無効ならMODEL_NAMEのまま。
+    """
+    if not CONVERT_TO_SAFETENSORS:
+        return MODEL_NAME
+    if Path(MODEL_NAME).is_dir():
+        ensure_safetensors(MODEL_NAME)
+        return MODEL_NAME
+    try:
+        from huggingface_hub import snapshot_download
+
+        path = snapshot_download(MODEL_NAME, cache_dir=CACHE_DIR, local_files_only=True)
+    except Exception:
+        return MODEL_NAME
+    ensure_safetensors(path)
+    return path
+
 
+def _load_base_model():
+    """設定に従ってHFモデルを読み込む（CPUではfp32）。ローカル優先、失敗時はHubから取得。"""
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    _init_device()
     dtype = _preferred_dtype()
     logger.info(f"Loading reranker model (dtype={dtype}, 8bit={USE_8BIT})...")
 
     def _do_load(local_only: bool):
+        source = _local_model_source() if local_only else MODEL_NAME
         if USE_8BIT:
             # 8ビット量化（より省メモリ；大きなモデルでより効果的、小さなモデルでは差は限定的）
             try:
@@ -90,7 +197,7 @@ def _load_model():
 
                 quant_cfg = BitsAndBytesConfig(load_in_8bit=True)
                 m = AutoModelForSequenceClassification.from_pretrained(
-                    MODEL_NAME,
+                    source,
                     cache_dir=CACHE_DIR,
                     local_files_only=local_only,
                     low_cpu_mem_usage=True,
@@ -102,7 +209,7 @@ def _load_model():
                 logger.warning(f"8-bit load failed ({e}), fallback to non-8bit.")
         # 非量化パス：目標dtypeで直接読み込み
         m = AutoModelForSequenceClassification.from_pretrained(
-            MODEL_NAME,
+            source,
             cache_dir=CACHE_DIR,
             local_files_only=local_only,
             low_cpu_mem_usage=True,
@@ -112,15 +219,131 @@ def _load_model():
         return m
 
     try:
-        _model = _do_load(local_only=True)
+        m = _do_load(local_only=True)
     except Exception as e:
         logger.warning(f"Local model load failed: {e}. Downloading from hub...")
-        _model = _do_load(local_only=False)
+        m = _do_load(local_only=False)
+    m.eval()
+    return m
+
+
+class _OnnxOutput:
+    def __init__(self, logits: Tensor):
+        self.logits = logits
+
+
+class _OnnxCrossEncoder:
+    """onnxruntimeセッションをHFモデルと同じ呼び出し方（model(**inputs).logits）で使うラッパー。"""
+
+    def __init__(self, session):
+        self._session = session
+        self._input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, **inputs) -> _OnnxOutput:
+        feeds = {
+            name: inputs[name].cpu().numpy().astype("int64")
+            for name in self._input_names
+            if name in inputs
+        }
+        import torch
+
+        (logits,) = self._session.run(["logits"], feeds)
+        return _OnnxOutput(torch.from_numpy(logits))
+
+
+def _onnx_path() -> Path:
+    if ONNX_PATH:
+        return Path(ONNX_PATH)
+    return Path(CACHE_DIR or ".") / "onnx" / f"{MODEL_NAME.replace('/', '__')}.onnx"
+
 
-    _model.eval()
+def _export_onnx(model, path: Path) -> None:
+    """fp32モデルを動的軸（batch, sequence）付きでONNXにエクスポート。"""
+    import torch
+
+    class _LogitsOnly(torch.nn.Module):
+        """エクスポート用：位置引数のテンソルを入力名に対応付け、logitsのみを返す。"""
+
+        def __init__(self, model, input_names: List[str]):
+            super().__init__()
+            self.model = model
+            self.input_names = input_names
+
+        def forward(self, *tensors):
+            return self.model(**dict(zip(self.input_names, tensors))).logits
+
+    tokenizer = _tokenizer or _load_tokenizer()
+    sample = tokenizer([("query", "passage")], return_tensors="pt")
+    names = list(sample.keys())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp-{os.getpid()}")
+    torch.onnx.export(
+        _LogitsOnly(model, names),
+        tuple(sample[name] for name in names),
+        str(tmp),
+        input_names=names,
+        output_names=["logits"],
+        dynamic_axes={
+            **{name: {0: "batch", 1: "sequence"} for name in names},
+            "logits": {0: "batch"},
+        },
+        opset_version=17,
+    )
+    os.replace(tmp, path)
+    logger.info(f"Exported reranker to ONNX: {path}")
+
+
+def _apply_cpu_backend(model, backend: str):
+    """
+    CPU向けバックエンドを適用し (model, 実際のbackend) を返す。
+    int8はLinear層の動的量子化、onnxはonnxruntime（未インストール/失敗時はfp32のまま）。
+    """
+    if backend == "int8":
+        import torch
+
+        quantized = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Reranker linear layers quantized to int8 (dynamic).")
+        return quantized, "int8"
+    if backend == "onnx":
+        try:
+            import onnxruntime as ort
+
+            path = _onnx_path()
+            if not path.exists():
+                _export_onnx(model, path)
+            options = ort.SessionOptions()
+            if CPU_THREADS:
+                options.intra_op_num_threads = int(CPU_THREADS)
+            session = ort.InferenceSession(
+                str(path), options, providers=["CPUExecutionProvider"]
+            )
+            logger.info(f"Reranker running on onnxruntime: {path}")
+            return _OnnxCrossEncoder(session), "onnx"
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable ({e}), fallback to fp32.")
+            return model, "fp32"
+    if backend != "fp32":
+        logger.warning(f"Unknown rerankCPUBackend '{backend}', using fp32.")
+    return model, "fp32"
+
+
+def _load_model():
+    global _model, _active_backend
+    if _model is not None:
+        return _model
+    import torch
+
+    model = _load_base_model()
+    if device == "cpu":
+        model, _active_backend = _apply_cpu_backend(model, CPU_BACKEND)
+    _model = model
+    # 以前のモデルで計算したスコアは無効（キーにもモデル名を含む）
+    _score_cache.clear()
 
     # PyTorch 2コンパイルでスループット向上（注意：初回JITコンパイルで一時的なオーバーヘッドあり；長時間実行/サービス環境で効果的）
-    if USE_COMPILE and hasattr(torch, "compile"):
+    if USE_COMPILE and hasattr(torch, "compile") and _active_backend != "onnx":
         try:
             _model = torch.compile(_model, mode="max-autotune")
             logger.info("Model compiled with torch.compile.")
@@ -138,67 +361,132 @@ def _load_model():
     return _model
 
 
-# Warm up only when reranking is enabled; this avoids hard startup
-# dependency on network/model downloads in local/offline environments.
-if config.RAG.Retrieval.usingRerank:
-    _tokenizer = _load_tokenizer()
-    _model = _load_model()
-
 
 # ---------------------------
 # コア推論関数
 # ---------------------------
-def _batch_pairs(query: str, passages: Sequence[str], bsz: int):
-    """(query, passage)ペアデータをバッチごとにスライス。"""
-    n = len(passages)
-    for i in range(0, n, bsz):
-        yield [(query, passages[j]) for j in range(i, min(i + bsz, n))]
+def _batch_pairs(pairs: Sequence, bsz: int):
+    """(query, passage)ペアデータ（またはそのインデックス）を到着順にバッチごとにスライス。"""
+    for i in range(0, len(pairs), bsz):
+        yield list(pairs[i : i + bsz])
 
 
-@torch.inference_mode()
-def _predict_scores(
-    query: str, texts: Sequence[str], max_length: int, batch_size: int
-) -> Tensor:
-    """バッチごとのtokenization + 推論、shape=[N]のスコアテンソル（torch.sigmoid(logits)）を返す。"""
-    tokenizer = _tokenizer or _load_tokenizer()
-    model = _model or _load_model()
+def _forward(model, inputs) -> Tensor:
+    """1バッチの推論、shape=[B]のスコア（CPU上）。"""
+    import torch
+
+    # 入力を事前にGPUに転送（非同期転送で若干の高速化）
+    inputs = {k: v.to(device, non_blocking=True) for k, v in inputs.items()}
 
-    scores: List[Tensor] = []
     use_autocast = (device == "cuda") and (
         not USE_8BIT
     )  # 量化モデルは通常autocastが不要
+    if use_autocast:
+        # bf16を優先、次にfp16を選択
+        amp_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        with torch.autocast(device_type="cuda", dtype=amp_dtype):
+            logits = model(**inputs).logits  # type: ignore
+    else:
+        logits = model(**inputs).logits  # type: ignore
 
-    for pairs in _batch_pairs(query, texts, batch_size):
-        inputs = tokenizer(
-            pairs,
-            padding=True,  # 本バッチ最長までpadding、512全填充を回避
+    # 多くのクロスエンコーダーは二値分類/回帰ヘッド；sigmoidで[0,1]に圧縮
+    return torch.sigmoid(logits).squeeze(-1).detach().to("cpu")
+
+
+def _pair_features(
+    tokenizer,
+    pairs: Sequence[Tuple[str, str]],
+    max_length: int,
+    passage_token_ids: Optional[Sequence[Optional[List[int]]]] = None,
+) -> List[dict]:
+    """
+    paddingなしのペア入力（input_ids等）。passage_token_idsが与えられたペアはqueryのみtokenizeし、
+    保存済みのpassageトークンIDと組み合わせる（結果は通常のペアtokenizeと同じ）。
+    """
+    cached = passage_token_ids or [None] * len(pairs)
+    features: List[Optional[dict]] = [None] * len(pairs)
+
+    todo = [i for i, ids in enumerate(cached) if ids is None]
+    if todo:
+        encoded = tokenizer(
+            [pairs[i][0] for i in todo],
+            [pairs[i][1] for i in todo],
+            padding=False,
             truncation="only_second",  # 完全なqueryを保持、passageを優先的に切り詰め
             max_length=max_length,
-            return_tensors="pt",
         )  # type: ignore
+        keys = list(encoded.keys())
+        for row, i in enumerate(todo):
+            features[i] = {k: encoded[k][row] for k in keys}
+
+    query_ids: dict = {}
+    for i, ids in enumerate(cached):
+        if ids is None:
+            continue
+        query = pairs[i][0]
+        if query not in query_ids:
+            query_ids[query] = tokenizer(query, add_special_tokens=False)["input_ids"]
+        features[i] = dict(
+            tokenizer.prepare_for_model(
+                query_ids[query],
+                ids,
+                truncation="only_second",
+                max_length=max_length,
+            )
+        )
+    return features  # type: ignore
 
-        # 入力を事前にGPUに転送（非同期転送で若干の高速化）
-        inputs = {k: v.to(device, non_blocking=True) for k, v in inputs.items()}
 
-        if use_autocast:
-            # bf16を優先、次にfp16を選択
-            amp_dtype = (
-                torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
-            )
-            with torch.autocast(device_type="cuda", dtype=amp_dtype):
-                logits = model(**inputs).logits  # type: ignore
-        else:
-            logits = model(**inputs).logits  # type: ignore
+def _predict_pair_scores(
+    pairs: Sequence[Tuple[str, str]],
+    max_length: int,
+    batch_size: int,
+    token_budget: Optional[int] = TOKEN_BUDGET,
+    model=None,
+    passage_token_ids: Optional[Sequence[Optional[List[int]]]] = None,
+) -> Tensor:
+    """
+    (query, passage)ペア単位のtokenization + 推論、shape=[N]のスコアテンソル（torch.sigmoid(logits)）を返す。
+    ペアごとにqueryが異なってもよい（複数リクエストの同一バッチ処理用）。
 
-        # 多くのクロスエンコーダーは二値分類/回帰ヘッド；sigmoidで[0,1]に圧縮
-        batch_scores = torch.sigmoid(logits).squeeze(-1)
-        scores.append(batch_scores.detach().to("cpu"))
+    全ペアを先にpaddingなしでtokenizeし（保存済みのpassageトークンIDがあれば再利用）、
+    token_budget 指定時はトークン長でソートしたバケットごとにバッチ化（paddingを最小化）、
+    None では到着順に batch_size 件ずつ処理。スコアは元の順序で返す。
+    """
+    import torch
 
-    return torch.cat(scores, dim=0) if scores else torch.empty(0, dtype=torch.float32)
+    tokenizer = _tokenizer or _load_tokenizer()
+    model = model or _model or _load_model()
+    if not pairs:
+        return torch.empty(0, dtype=torch.float32)
+
+    features = _pair_features(tokenizer, pairs, max_length, passage_token_ids)
+    if token_budget:
+        lengths = [len(f["input_ids"]) for f in features]
+        batches = length_buckets(lengths, token_budget, batch_size)
+    else:
+        batches = _batch_pairs(range(len(features)), batch_size)
+
+    result = torch.empty(len(pairs), dtype=torch.float32)
+    with torch.inference_mode():
+        for batch in batches:
+            # 本バッチ最長までpadding、512全填充を回避
+            inputs = tokenizer.pad([features[i] for i in batch], return_tensors="pt")  # type: ignore
+            result[torch.tensor(batch)] = _forward(model, inputs).float()
+    return result
+
+
+def _predict_scores(
+    query: str, texts: Sequence[str], max_length: int, batch_size: int
+) -> Tensor:
+    """1つのqueryに対する候補textsのスコア、shape=[N]。"""
+    return _predict_pair_scores([(query, t) for t in texts], max_length, batch_size)
 
 
 def _guess_batch_size(n: int) -> int:
     """デバイスに応じて比較的安全なbatch sizeを選択、必要に応じて微調整/外部設定可能。"""
+    if _tuned is not None:
+        return _tuned.batch_size
     if device == "cuda":
         # 超長文対応時のメモリリスク軽減、サンプル量に応じて若干調整
         base = DEFAULT_BSZ_CUDA
@@ -209,6 +497,188 @@ def _guess_batch_size(n: int) -> int:
         return min(DEFAULT_BSZ_CPU, max(8, int(0.5 * DEFAULT_BSZ_CPU)))
 
 
+def _max_batch_pairs() -> int:
+    if _tuned is not None:
+        return _tuned.batch_size
+    return DEFAULT_BSZ_CUDA if device == "cuda" else DEFAULT_BSZ_CPU
+
+
+def _autotune() -> Optional[TunedSettings]:
+    """
+    保存済みの設定があれば再利用、なければ合成ペアで計測して保存。選んだスレッド数を適用。
+    スレッド数はtorchのCPU推論のみ対象（CUDA/onnxruntimeではbatch sizeのみ）。失敗時は静的設定のまま。
+    """
+    key = settings_key(MODEL_NAME, _active_backend, device, MAX_LENGTH)
+    try:
+        tuned = load_settings(AUTOTUNE_PATH, key)
+        if tuned is not None:
+            logger.info(f"Reusing reranker autotune settings from {AUTOTUNE_PATH}")
+        else:
+            logger.info("Calibrating reranker batch size / threads...")
+            tuned = calibrate(
+                lambda query, texts, bsz: _predict_scores(query, texts, MAX_LENGTH, bsz),
+                key=key,
+                batch_sizes=AUTOTUNE_BATCH_SIZES,
+                thread_counts=(
+                    AUTOTUNE_THREADS if _active_backend in ("fp32", "int8") else [None]
+                ),
+                requests=synthetic_requests(4, 2 * max(AUTOTUNE_BATCH_SIZES)),
+            )
+            try:
+                save_settings(AUTOTUNE_PATH, tuned)
+            except Exception as e:
+                logger.warning(f"Failed to save reranker autotune settings: {e}")
+    except Exception as e:
+        logger.warning(f"Reranker autotune failed, using configured batch sizes: {e}")
+        return None
+    if tuned.threads:
+        import torch
+
+        torch.set_num_threads(tuned.threads)
+    logger.info(
+        f"Reranker settings: batch_size={tuned.batch_size}, threads={_torch_threads()} "
+        f"({tuned.pairs_per_second:.1f} pairs/s)"
+    )
+    return tuned
+
+
+_tuned: Optional[TunedSettings] = None
+
+metrics.gauge(
+    "rag.rerank.settings",
+    lambda: {
+        "backend": _active_backend,
+        "device": device,
+        "batch_size": _guess_batch_size(0),
+        "max_batch_pairs": _max_batch_pairs(),
+        "threads": _torch_threads(),
+        "max_length": MAX_LENGTH,
+        "autotuned": _tuned is not None,
+        "autotune_pairs_per_second": _tuned.pairs_per_second if _tuned else None,
+    },
+)
+
+# 複数リクエストのペアを rerankBatchSize（CPU: rerankBatchSizeCPU）まで、または
+# 最大 rerankMaxWaitMs 待ってまとめ、1回のforwardで推論する
+_scheduler = RerankScheduler(
+    lambda items: _predict_pair_scores(
+        [(query, text) for query, text, _ in items],
+        MAX_LENGTH,
+        _guess_batch_size(len(items)),
+        passage_token_ids=[token_ids for _, _, token_ids in items],
+    ).tolist(),
+    max_batch_pairs=_max_batch_pairs(),
+    max_wait_ms=MAX_WAIT_MS,
+)
+
+
+def load() -> None:
+    """tokenizer/モデルの読み込み（+ autotune）。APIではバックグラウンドで実行される（core.readiness）。"""
+    global _tuned
+    _load_tokenizer()
+    _load_model()
+    if AUTOTUNE:
+        _tuned = _autotune()
+    # デバイス確定後のバッチ上限（CUDA: rerankBatchSize）
+    _scheduler.max_batch_pairs = _max_batch_pairs()
+
+
+# rerank有効時のみ起動時に読み込む（ネットワーク/モデルDLへの起動時依存を避ける）。無効時は初回使用時
+readiness.register("reranker", load, eager=bool(config.RAG.Retrieval.usingRerank))
+
+
+def _normalize_query(query: str) -> str:
+    """全角/半角・空白の違いを吸収したキャッシュ用query。"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip()
+
+
+def _cache_key(normalized_query: str, text: str) -> tuple:
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    return (normalized_query, digest, MODEL_NAME, MAX_LENGTH, _active_backend)
+
+
+def pretokenize_passages(chunk_ids: Sequence[str], texts: Sequence[str]) -> None:
+    """
+    取り込み時にpassageのトークンID（特殊トークンなし、MAX_LENGTHで切り詰め）をチャンクIDで保存。
+    rerankPretokenize無効時は何もしない。失敗しても取り込みは継続（rerank時に通常tokenize）。
+    """
+    if not PRETOKENIZE or not chunk_ids:
+        return
+    try:
+        tokenizer = _tokenizer or _load_tokenizer()
+        token_ids = tokenizer(
+            list(texts), add_special_tokens=False, truncation=True, max_length=MAX_LENGTH
+        )["input_ids"]
+        passage_token_store.put_many(
+            chunk_ids, texts, token_ids, model=MODEL_NAME, max_length=MAX_LENGTH
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store reranker tokens for {len(chunk_ids)} chunks: {e}")
+
+
+def _stored_token_ids(
+    chunk_ids: Sequence[Optional[str]], texts: Sequence[str]
+) -> List[Optional[List[int]]]:
+    """保存済みpassageトークンID（なければNone）。"""
+    if not PRETOKENIZE:
+        return [None] * len(texts)
+    known = [(i, t) for i, t in zip(chunk_ids, texts) if i]
+    try:
+        found = passage_token_store.get_many(
+            [i for i, _ in known],
+            [t for _, t in known],
+            model=MODEL_NAME,
+            max_length=MAX_LENGTH,
+        )
+    except Exception as e:
+        logger.warning(f"Reranker token store unavailable: {e}")
+        found = {}
+    return [found.get(i) if i else None for i in chunk_ids]
+
+
+def _score_texts(
+    query: str, texts: List[str], token_ids: Sequence[Optional[List[int]]]
+) -> List[float]:
+    """textsのスコア（推論はマイクロバッチング経由、または直接）。"""
+    if USE_MICRO_BATCHING:
+        return _scheduler.score([(query, t, ids) for t, ids in zip(texts, token_ids)])
+    bsz = _guess_batch_size(len(texts))
+    return _predict_pair_scores(
+        [(query, t) for t in texts], MAX_LENGTH, bsz, passage_token_ids=token_ids
+    ).tolist()
+
+
+def _cached_scores(
+    query: str, texts: List[str], chunk_ids: Sequence[Optional[str]]
+) -> Tensor:
+    """キャッシュにないpassageのみ推論し、キャッシュ済みスコアとマージ、shape=[N]。"""
+    normalized = _normalize_query(query)
+    keys = [_cache_key(normalized, t) for t in texts]
+    scores: List[Optional[float]] = [_score_cache.get(k) for k in keys]
+    # 同一内容のpassageは1回だけ推論
+    missing: dict = {}
+    for i, score in enumerate(scores):
+        if score is None:
+            missing.setdefault(keys[i], []).append(i)
+    _cache_hits.inc(len(texts) - sum(len(rows) for rows in missing.values()))
+    _cache_misses.inc(sum(len(rows) for rows in missing.values()))
+
+    if missing:
+        miss_rows = [rows[0] for rows in missing.values()]
+        computed = _score_texts(
+            query,
+            [texts[i] for i in miss_rows],
+            _stored_token_ids([chunk_ids[i] for i in miss_rows], [texts[i] for i in miss_rows]),
+        )
+        for key, score in zip(missing, computed):
+            _score_cache.put(key, score)
+            for i in missing[key]:
+                scores[i] = score
+    import torch
+
+    return torch.tensor(scores, dtype=torch.float32)
+
+
 def get_ranked_results(
     query: str, passages: List[ChromaDBSearchResultItem] | List[Document], top_n: Optional[int]
 ) -> List[ChromaDBSearchResultItem] | List[Document]:
@@ -217,14 +687,22 @@ def get_ranked_results(
     """
     if not passages:
         return []
-    
+    readiness.get("reranker")
+    import torch
+
     if isinstance(passages[0], Document):
         texts: List[str] = [p.page_content for p in passages]  # type: ignore
     elif isinstance(passages[0], ChromaDBSearchResultItem):
         texts: List[str] = [p.content for p in passages]  # type: ignore
+    chunk_ids: List[Optional[str]] = [getattr(p, "id", None) for p in passages]
 
-    bsz = _guess_batch_size(len(texts))
-    scores: Tensor = _predict_scores(query, texts, MAX_LENGTH, bsz)  # shape=[N]
+    if USE_SCORE_CACHE:
+        scores = _cached_scores(query, texts, chunk_ids)  # shape=[N]
+    else:
+        scores = torch.tensor(
+            _score_texts(query, texts, _stored_token_ids(chunk_ids, texts)),
+            dtype=torch.float32,
+        )
 
     if scores.numel() != len(passages):
         logger.error("Score/Passage length mismatch. Fallback to original order.")
@@ -0,0 +1,49 @@
+"""
+Metadata filters (`where`) of hybrid search requests.
+
+A filter maps an indexed metadata field to a value or a list of accepted values; fields
+are ANDed. Requests are validated against the indexed fields when they are parsed, so a
+bad filter is a 422 rather than a failed search.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+from config.index import config
+
+# Metadata fields indexed with the BM25 postings: usable in `where` filters, and deletes
+# by these fields are applied to a loaded index. file_id is always indexed (deletes).
+BM25_INDEX_FIELDS: Tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [
+            *(
+                getattr(config.RAG.Retrieval, "bm25FilterFields", None)
+                or ["DocumentName", "uploaded_by_s", "file_id"]
+            ),
+            "file_id",
+        ]
+    )
+)
+
+
+def normalize_where(
+    where: Optional[Dict[str, Union[str, List[str]]]],
+) -> Optional[Dict[str, List[str]]]:
+    """
+    Validate a search filter (field -> value or list of accepted values) against the
+    indexed fields. Returns field -> accepted values as strings, or None for no filter.
+    """
+    if not where:
+        return None
+    unknown = [field for field in where if field not in BM25_INDEX_FIELDS]
+    if unknown:
+        raise ValueError(
+            f"Cannot filter on {unknown}; filterable fields: {list(BM25_INDEX_FIELDS)}"
+        )
+    normalized = {
+        field: [str(v) for v in (values if isinstance(values, list) else [values])]
+        for field, values in where.items()
+    }
+    empty = [field for field, values in normalized.items() if not values]
+    if empty:
+        raise ValueError(f"Empty value list in filter for {empty}")
+    return normalized
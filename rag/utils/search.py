@@ -13,36 +13,55 @@ class ChromaDBSearchResultItem(BaseModel):
     file_path_s: Optional[str]
     score: Optional[float]
 
-def search_query(collection: Collection, query_text: str, top_k: int = 3) -> Optional[list[ChromaDBSearchResultItem]]:
+def parse_query_result(results: QueryResult) -> Optional[list[ChromaDBSearchResultItem]]:
+    if not results or not results["documents"]:
+        return None
+
+    ids = results["ids"][0] if results["ids"] else []
+    documents = results["documents"][0]
+    metadatas = results["metadatas"][0] if results["metadatas"] else [{}]*len(documents)
+    scores = results["distances"][0] if results["distances"] else [0]*len(documents)
+
+    return [
+        ChromaDBSearchResultItem(
+            id=id,
+            content=doc,
+            chunk_number_i=meta.get("chunk_number_i", -1),  # type: ignore
+            title=meta.get("title", ""),  # type: ignore
+            file_path_s=meta.get("file_path_s", ""),  # type: ignore
+            score=score
+        )
+        for id, doc, meta, score in zip(ids, documents, metadatas, scores)
+    ]
+
+def embed_search_query(query_text: str) -> list[float]:
+    cleaned = process_text(query_text)
+    if config.APP_MODE == "rag-evaluation":
+        logger.debug(f"[SEARCH] Processed Query: '{cleaned}'")
+    return embed_text(cleaned)
+
+def search_query(
+    collection: Collection,
+    query_text: Optional[str] = None,
+    top_k: int = 3,
+    *,
+    query_vector: Optional[list[float]] = None,
+) -> Optional[list[ChromaDBSearchResultItem]]:
+    """
+    Query a single collection. Pass `query_vector` (see `embed_search_query`) to reuse one
+    query embedding across many collections instead of re-embedding `query_text` per call.
+    """
     try:
-        cleaned = process_text(query_text)
-        if config.APP_MODE == "rag-evaluation":
-            logger.debug(f"[SEARCH] Processed Query: '{cleaned}'")
-        vector = embed_text(cleaned)
+        if query_vector is None:
+            if query_text is None:
+                raise ValueError("Either query_text or query_vector must be provided.")
+            query_vector = embed_search_query(query_text)
         results = collection.query(
-            query_embeddings=[vector],
+            query_embeddings=[query_vector],
             n_results=top_k,
             include=["documents", "metadatas", "distances"]
         )
-        if not results or not results["documents"]:
-            return None
-        
-        ids = results["ids"][0] if results["ids"] else []
-        documents = results["documents"][0]
-        metadatas = results["metadatas"][0] if results["metadatas"] else [{}]*len(documents)
-        scores = results["distances"][0] if results["distances"] else [0]*len(documents)
-
-        return [
-            ChromaDBSearchResultItem(
-                id=id,
-                content=doc,
-                chunk_number_i=meta.get("chunk_number_i", -1),  # type: ignore
-                title=meta.get("title", ""),  # type: ignore
-                file_path_s=meta.get("file_path_s", ""),  # type: ignore
-                score=score
-            )
-            for id, doc, meta, score in zip(ids, documents, metadatas, scores)
-        ]
+        return parse_query_result(results)
     except Exception as e:
         if config.APP_MODE == "rag-evaluation":
             logger.error(f"[SEARCH_QUERY] Failed query: {e}", exc_info=True)
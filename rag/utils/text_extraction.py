@@ -1,15 +1,17 @@
 import io
-from PyPDF2 import PdfReader
-from docx import Document
 
 def extract_text_from_file(filename: str, content: bytes) -> str:
     ext = filename.lower().split('.')[-1]
     text = ""
 
     if ext == "pdf":
+        from PyPDF2 import PdfReader
+
         reader = PdfReader(io.BytesIO(content))
         text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
     elif ext == "docx":
+        from docx import Document
+
         doc = Document(io.BytesIO(content))
         text = "\n".join(p.text for p in doc.paragraphs)
     elif ext == "txt":